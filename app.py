@@ -1,15 +1,62 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, g
 from database import *
+from import_records import detect_format, open_upload, read_rows
+from metrics import Counter, Histogram, render_metrics
 from functools import wraps
 import csv
-from io import StringIO
+from io import BytesIO, StringIO
 from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+import time
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Change this in production!
-
-# Initialize database
+app.config['DATABASE'] = os.environ.get('TIME_TRACKER_DB', 'time_tracker.db')
+# Push record changes to dashboards over /records/events. Each open dashboard
+# then holds a server worker, so only turn this on with threaded workers.
+app.config['PUSH_UPDATES'] = os.environ.get('TIME_TRACKER_PUSH_UPDATES') == '1'
+
+# Initialize database, then close the connection init_db() opened so a
+# server that forks workers after importing the app does not hand it to them
+configure_database(app.config['DATABASE'])
 init_db()
+close_connection()
+
+# Timestamps are stored as epoch seconds; render them as local time
+@app.template_filter('datetime')
+def datetime_filter(value):
+    return format_timestamp(value, '%Y-%m-%d %H:%M')
+
+# Request metrics, labelled by route pattern rather than URL so record ids
+# do not each get a series. Streamed responses (exports, the event stream)
+# are timed until their headers are ready, not until the body is sent.
+SQL_STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+request_duration = Histogram('http_request_duration_seconds', 'Time to handle a request', ['method', 'route'])
+requests_total = Counter('http_requests_total', 'Requests handled', ['method', 'route', 'status'])
+request_sql_statements = Histogram('http_request_sql_statements', 'SQL statements run per request',
+                                   ['route'], SQL_STATEMENT_BUCKETS)
+request_sql_duration = Histogram('http_request_sql_seconds', 'Time spent in SQL per request', ['route'])
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    reset_sql_stats(f'{request.method} {route}')
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        statements, sql_seconds = get_sql_stats()
+        request_duration.observe(time.perf_counter() - started, method=request.method, route=route)
+        requests_total.inc(method=request.method, route=route, status=response.status_code)
+        request_sql_statements.observe(statements, route=route)
+        request_sql_duration.observe(sql_seconds, route=route)
+    return response
 
 # Login required decorator
 def login_required(f):
@@ -37,6 +84,46 @@ def role_required(roles):
         return decorated_function
     return decorator
 
+# Conditional GET. The ETag covers the data revision, the user and the
+# whole query string, so a matching If-None-Match is answered with 304 before
+# any records are read. Tags are weak because live time fields in the body
+# move on while the data behind them stays the same.
+def make_etag(*parts):
+    key = json.dumps([get_data_revision(), session.get('role'), session.get('username'),
+                      sorted(request.args.items(multi=True))] + list(parts))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def not_modified(etag):
+    if request.if_none_match.contains_weak(etag):
+        return with_etag(app.response_class(status=304), etag)
+    return None
+
+def with_etag(response, etag):
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+# User lists change rarely, so they come from an in-process cache and are
+# tagged with a digest of their content; browsers revalidate and get a 304
+# until a user is added, renamed or removed.
+def users_response(key, role=None):
+    users, version = get_cached_users(role)
+    response = not_modified(version)
+    if response:
+        return response
+    return with_etag(jsonify({key: users}), version)
+
+# Reports may read a snapshot (see configure_reporting); these headers say
+# how current it is. Neither is sent when reports read live data.
+def reporting_headers():
+    data_as_of = reporting_data_as_of()
+    if data_as_of is None:
+        return {}
+    return {
+        'X-Data-As-Of': datetime.fromtimestamp(data_as_of).isoformat(timespec='seconds'),
+        'X-Max-Staleness': str(int(get_reporting_max_age()))
+    }
+
 @app.route('/')
 def index():
     if 'username' in session:
@@ -69,7 +156,8 @@ def logout():
 def dashboard():
     return render_template('dashboard.html', 
                          username=session['username'], 
-                         role=session['role'])
+                         role=session['role'],
+                         push_updates=app.config['PUSH_UPDATES'])
 
 # User Management (Admin only)
 @app.route('/admin/users')
@@ -84,11 +172,38 @@ def admin_users():
 @role_required(['admin'])
 def api_get_users():
     try:
-        users = get_users()
-        return jsonify({'users': users})
+        return users_response('users')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Slow-query log of this worker process: statements over the threshold with
+# their query plans. Admins can set the threshold (empty turns logging off)
+# and clear the log here.
+@app.route('/admin/slow-queries', methods=['GET', 'POST'])
+@login_required
+@role_required(['admin'])
+def admin_slow_queries():
+    error = None
+    if request.method == 'POST':
+        if request.form.get('action') == 'clear':
+            clear_slow_queries()
+            return redirect(url_for('admin_slow_queries'))
+        threshold = request.form.get('threshold_ms', '').strip()
+        try:
+            threshold = float(threshold) if threshold else None
+            if threshold is not None and threshold < 0:
+                raise ValueError
+        except ValueError:
+            error = 'Threshold must be a number of milliseconds'
+        else:
+            configure_slow_query_log(threshold)
+            return redirect(url_for('admin_slow_queries'))
+    
+    settings = get_slow_query_log_settings()
+    return render_template('admin_slow_queries.html', queries=get_slow_queries(), error=error,
+                           threshold_ms=settings['threshold_ms'], size=settings['size'],
+                           username=session['username'], role=session['role'])
+
 @app.route('/admin/create_user', methods=['POST'])
 @login_required
 @role_required(['admin'])
@@ -175,6 +290,25 @@ def get_records_route():
         limit = int(request.args.get('limit', 20))
         offset = (page - 1) * limit
         
+        # ETA warnings move at midnight, so the day is part of the tag too
+        etag = make_etag(datetime.now().strftime('%Y-%m-%d'))
+        response = not_modified(etag)
+        if response:
+            return response
+        
+        # Read before the page so /records/changes?since=revision never misses
+        # a write that lands in between
+        revision = get_data_revision()
+        
+        # Cursor mode is used whenever a cursor parameter is sent (empty for
+        # the first page); page numbers remain as a fallback for jumps
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
         user_role = session['role']
         username = session['username']
         
@@ -184,87 +318,43 @@ def get_records_route():
         else:
             developer_filter = None
         
-        records = get_records(
+        # count=none skips the total for clients that only page with cursors
+        include_total = request.args.get('count', 'exact') != 'none'
+        
+        # Old Published records are archived; the Published filter always
+        # includes them and include_archived=true adds them to an unfiltered list
+        include_archived = request.args.get('include_archived', 'false').lower() == 'true'
+        
+        records, total_records = get_records_page(
             user_role=user_role, 
             username=username, 
             status=status_filter, 
             search=search_query,
             developer_filter=developer_filter,
-            limit=limit,
-            offset=offset
+            limit=limit + 1,
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total,
+            include_archived=include_archived
         )
         
-        total_records = get_records_count(
-            user_role=user_role,
-            username=username,
-            status=status_filter,
-            search=search_query,
-            developer_filter=developer_filter
-        )
-        
-        # Add time tracking data for each record
-        for record in records:
-            # Add ETA warning
-            if record['eta']:
-                try:
-                    eta_date = datetime.strptime(record['eta'], '%Y-%m-%d')
-                    days_until_eta = (eta_date - datetime.now()).days
-                    record['eta_warning'] = days_until_eta <= 2
-                except ValueError:
-                    record['eta_warning'] = False
-            else:
-                record['eta_warning'] = False
-            
-            # Calculate current time for active statuses and add to total
-            current_todo_time = record['total_todo_time']
-            current_in_progress_time = record['total_in_progress_time']
-            current_in_review_time = record['total_in_review_time']
-            current_review_failed_time = record['total_review_failed_time']
-            
-            # Add current active time if status is TODO
-            if record['status'] == 'TODO' and record['todo_start_time']:
-                current_todo_time += calculate_time_spent(record['todo_start_time'])
-            
-            # Add current active time if status is In Progress
-            if record['status'] == 'In Progress' and record['in_progress_start_time']:
-                current_in_progress_time += calculate_time_spent(record['in_progress_start_time'])
-            
-            # Add current active time if status is In Review
-            if record['status'] == 'In Review' and record['in_review_start_time']:
-                current_in_review_time += calculate_time_spent(record['in_review_start_time'])
-            
-            # Add current active time if status is Review failed - In Progress
-            if record['status'] == 'Review failed - In Progress' and record['review_failed_start_time']:
-                current_review_failed_time += calculate_time_spent(record['review_failed_start_time'])
-            
-            # Convert to hours and minutes
-            record['time_todo_hours'] = int(current_todo_time)
-            record['time_todo_minutes'] = int((current_todo_time - record['time_todo_hours']) * 60)
-            record['time_in_progress_hours'] = int(current_in_progress_time)
-            record['time_in_progress_minutes'] = int((current_in_progress_time - record['time_in_progress_hours']) * 60)
-            record['time_in_review_hours'] = int(current_in_review_time)
-            record['time_in_review_minutes'] = int((current_in_review_time - record['time_in_review_hours']) * 60)
-            record['time_review_failed_hours'] = int(current_review_failed_time)
-            record['time_review_failed_minutes'] = int((current_review_failed_time - record['time_review_failed_hours']) * 60)
-            
-            record['time_todo'] = current_todo_time
-            record['time_in_progress'] = current_in_progress_time
-            record['time_in_review'] = current_in_review_time
-            record['time_review_failed'] = current_review_failed_time
-            
-            # Add tracking indicators
-            record['is_todo_tracking'] = record['status'] == 'TODO' and record['todo_start_time'] is not None
-            record['is_in_progress_tracking'] = record['status'] == 'In Progress' and record['in_progress_start_time'] is not None
-            record['is_in_review_tracking'] = record['status'] == 'In Review' and record['in_review_start_time'] is not None
-            record['is_review_failed_tracking'] = record['status'] == 'Review failed - In Progress' and record['review_failed_start_time'] is not None
+        # One extra row tells us whether there is a next page
+        has_more = len(records) > limit
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1]) if has_more else None
         
-        return jsonify({
+        # server_time lets clients tick running timers from their start times
+        return with_etag(jsonify({
             'records': records, 
             'user_role': user_role,
             'total_records': total_records,
             'current_page': page,
-            'total_pages': (total_records + limit - 1) // limit
-        })
+            'total_pages': (total_records + limit - 1) // limit if total_records is not None else None,
+            'next_cursor': next_cursor,
+            'has_more': has_more,
+            'server_time': int(time.time()),
+            'revision': revision
+        }), etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -284,16 +374,64 @@ def create_record_route():
         if not task or not book_id:
             return jsonify({'error': 'Task and Book ID are required'}), 400
         
-        record_id = create_record(task, book_id, session['username'], developer_assignee, page_count, ocr, eta)
+        record_id = run_write(create_record, task, book_id, session['username'], developer_assignee, page_count, ocr, eta)
         return jsonify({'message': 'Record created successfully', 'record_id': record_id})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Import records from an uploaded CSV (with a header row), JSON array or
+# JSON Lines file. The upload is parsed as a stream and inserted in chunks;
+# invalid rows are reported without stopping the import.
+@app.route('/records/import', methods=['POST'])
+@login_required
+@role_required(['admin', 'lead'])
+def import_records_route():
+    try:
+        upload = request.files.get('file')
+        if not upload:
+            return jsonify({'error': 'A file is required'}), 400
+        
+        fmt = request.form.get('format') or detect_format(upload.filename or '')
+        if fmt not in ('csv', 'json'):
+            return jsonify({'error': 'Format must be csv or json'}), 400
+        
+        result = bulk_create_records(read_rows(open_upload(upload.stream), fmt), session['username'])
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Delta sync: records changed after the revision a client last saw (from
+# /records or a previous call), plus ids of deleted records or records the
+# user can no longer see, and of records moved to the archive. fields=a,b
+# limits each record to those fields. truncated means too much changed and
+# the client should reload instead.
+@app.route('/records/changes')
+@login_required
+def get_record_changes_route():
+    try:
+        try:
+            since = int(request.args.get('since', ''))
+        except ValueError:
+            return jsonify({'error': 'since must be a revision number'}), 400
+        
+        changes = get_record_changes(since, session['role'], session['username'])
+        
+        fields = [f for f in request.args.get('fields', '').split(',') if f]
+        if fields:
+            fields = set(fields) | {'id'}
+            changes['records'] = [{k: v for k, v in record.items() if k in fields}
+                                  for record in changes['records']]
+        
+        changes['server_time'] = int(time.time())
+        return jsonify(changes)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/records/<int:record_id>')
 @login_required
 def get_record_route(record_id):
     try:
-        record = get_record_by_id(record_id)
+        record = get_record_with_time(record_id)
         if not record:
             return jsonify({'error': 'Record not found'}), 404
         
@@ -317,6 +455,8 @@ def update_record_route(record_id):
         # Check if user has permission to edit this record
         record = get_record_by_id(record_id)
         if not record:
+            if is_record_archived(record_id):
+                return jsonify({'error': 'Archived records cannot be changed'}), 409
             return jsonify({'error': 'Record not found'}), 404
         
         user_role = session['role']
@@ -328,7 +468,7 @@ def update_record_route(record_id):
         
         # Admin and Lead can update all fields
         if user_role in ['admin', 'lead']:
-            update_record(record_id, **data)
+            run_write(update_record, record_id, **data)
             return jsonify({'message': 'Record updated successfully'})
         
         return jsonify({'error': 'Access denied'}), 403
@@ -341,45 +481,86 @@ def update_record_status_route(record_id):
     try:
         data = request.json
         new_status = data.get('status')
+        # The status the client last saw; the change is refused if it moved on
+        from_status = data.get('from_status')
         
         if not new_status:
             return jsonify({'error': 'Status is required'}), 400
-        
-        # Check if user has permission to update status
-        record = get_record_by_id(record_id)
-        if not record:
-            return jsonify({'error': 'Record not found'}), 404
+        if new_status not in STATUS_TIMERS:
+            return jsonify({'error': 'Invalid status'}), 400
         
         user_role = session['role']
         username = session['username']
         
-        print(f"DEBUG: User {username} (role: {user_role}) trying to update record {record_id} status to {new_status}")
-        print(f"DEBUG: Record developer: {record.get('developer_assignee')}")
+        if user_role not in ['admin', 'lead', 'developer']:
+            return jsonify({'error': 'Access denied'}), 403
         
-        # Developers can update status of their assigned records
+        # Developers can only change to: In Progress, In Review, Review failed - In Progress, On-Hold, Published
         if user_role == 'developer':
-            # Check if developer is assigned to this record
-            if record.get('developer_assignee') == username:
-                # Developers can only change to: In Progress, In Review, Review failed - In Progress, On-Hold, Published
-                allowed_statuses = ['In Progress', 'In Review', 'Review failed - In Progress', 'On-Hold', 'Published']
-                if new_status not in allowed_statuses:
-                    return jsonify({'error': f'Developers can only set status to: {", ".join(allowed_statuses)}'}), 403
-                
-                print(f"DEBUG: Developer {username} is assigned to record, updating status to {new_status}")
-                update_record(record_id, status=new_status)
-                return jsonify({'message': 'Status updated successfully'})
-            else:
-                print(f"DEBUG: Developer {username} is NOT assigned to record {record_id}")
-                return jsonify({'error': 'Access denied - You can only update status of your assigned records'}), 403
+            allowed_statuses = ['In Progress', 'In Review', 'Review failed - In Progress', 'On-Hold', 'Published']
+            if new_status not in allowed_statuses:
+                return jsonify({'error': f'Developers can only set status to: {", ".join(allowed_statuses)}'}), 403
+        
+        # Developers can update status of their assigned records; admin and
+        # lead can update any record. The checks are part of the UPDATE itself.
+        assignee = username if user_role == 'developer' else None
+        if run_write(transition_record_status, record_id, new_status, from_status, assignee):
+            return jsonify({'message': 'Status updated successfully'})
         
-        # Admin and Lead can update status of any record
-        if user_role in ['admin', 'lead']:
-            update_record(record_id, status=new_status)
+        # Nothing changed - work out why
+        record = get_record_by_id(record_id)
+        if not record:
+            if is_record_archived(record_id):
+                return jsonify({'error': 'Archived records cannot be changed'}), 409
+            return jsonify({'error': 'Record not found'}), 404
+        if assignee and record['developer_assignee'] != username:
+            return jsonify({'error': 'Access denied - You can only update status of your assigned records'}), 403
+        if record['status'] == new_status:
             return jsonify({'message': 'Status updated successfully'})
+        return jsonify({'error': f'Record status was changed to {record["status"]} by someone else'}), 409
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Apply one operation to many records at once. The body is
+# {"ids": [...], "operation": "status", "status": ..., "from_status": ...} or
+# {"ids": [...], "operation": "reassign", "developer_assignee": ...};
+# from_status is optional and skips records in any other status.
+@app.route('/records/bulk', methods=['POST'])
+@login_required
+@role_required(['admin', 'lead'])
+def bulk_update_records_route():
+    try:
+        data = request.json or {}
+        record_ids = data.get('ids')
+        operation = data.get('operation')
+        
+        if not isinstance(record_ids, list) or not record_ids:
+            return jsonify({'error': 'A list of record ids is required'}), 400
+        if not all(isinstance(record_id, int) for record_id in record_ids):
+            return jsonify({'error': 'Record ids must be integers'}), 400
+        
+        from_status = data.get('from_status')
+        if from_status is not None and from_status not in STATUS_TIMERS:
+            return jsonify({'error': 'Invalid from_status'}), 400
+        
+        if operation == 'status':
+            new_status = data.get('status')
+            if new_status not in STATUS_TIMERS:
+                return jsonify({'error': 'A valid status is required'}), 400
+            results = bulk_update_records(record_ids, status=new_status, from_status=from_status)
+        elif operation == 'reassign':
+            developer = data.get('developer_assignee')
+            if developer not in [user['username'] for user in get_users(role='developer')]:
+                return jsonify({'error': 'A valid developer is required'}), 400
+            results = bulk_update_records(record_ids, developer_assignee=developer, from_status=from_status)
+        else:
+            return jsonify({'error': 'Operation must be "status" or "reassign"'}), 400
         
-        return jsonify({'error': 'Access denied'}), 403
+        return jsonify({
+            'results': [{'id': record_id, 'result': result} for record_id, result in results.items()],
+            'updated': sum(1 for result in results.values() if result == 'updated')
+        })
     except Exception as e:
-        print(f"DEBUG: Error in status update: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/records/<int:record_id>/delete', methods=['POST'])
@@ -394,38 +575,81 @@ def delete_record_route(record_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Server-Sent Events stream of record changes for the dashboard. "change"
+# events carry {"type", "id"} for the client to patch that row; "refresh"
+# asks it to reload its page because changes were missed or another worker
+# process wrote. Each open stream holds a server thread, so streams are only
+# served with PUSH_UPDATES on and close after EVENT_STREAM_MAX_HEARTBEATS
+# waits; the browser then reconnects and resumes.
+EVENT_STREAM_HEARTBEAT = 15
+EVENT_STREAM_MAX_HEARTBEATS = 20
+EVENT_STREAM_ID = f'{os.getpid()}-{int(time.time())}'
+
+@app.route('/records/events')
+@login_required
+def record_events():
+    if not app.config['PUSH_UPDATES']:
+        return jsonify({'error': 'Push updates are turned off'}), 404
+    
+    user_role = session['role']
+    username = session['username']
+    
+    # A reconnecting client resumes after the last event it saw, if this
+    # process sent it; otherwise it reloads once to catch up
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    stream_id, _, last_sequence = last_event_id.rpartition(':')
+    resume = stream_id == EVENT_STREAM_ID and last_sequence.isdigit()
+    sequence = int(last_sequence) if resume else get_change_sequence()
+    
+    def visible(change):
+        developers = change['developers']
+        return (user_role != 'developer' or developers is None
+                or username in developers or None in developers)
+    
+    def generate():
+        nonlocal sequence
+        revision = get_data_revision()
+        yield 'retry: 5000\n\n'
+        if last_event_id and not resume:
+            yield 'event: refresh\ndata: {}\n\n'
+        
+        for _ in range(EVENT_STREAM_MAX_HEARTBEATS):
+            changes, sequence_now = wait_for_record_changes(sequence, EVENT_STREAM_HEARTBEAT)
+            sequence = sequence_now
+            current_revision = get_data_revision()
+            
+            if changes is None:
+                yield 'event: refresh\ndata: {}\n\n'
+            elif changes:
+                for change in changes:
+                    if visible(change):
+                        data = json.dumps({'type': change['type'], 'id': change['id']})
+                        yield f"id: {EVENT_STREAM_ID}:{change['seq']}\nevent: change\ndata: {data}\n\n"
+            elif current_revision != revision:
+                # Written by another process
+                yield 'event: refresh\ndata: {}\n\n'
+            else:
+                yield ': keepalive\n\n'
+            revision = current_revision
+        
+        # Free the worker. The id lets the reconnecting browser resume from
+        # here even if no change was sent on this stream.
+        yield f"id: {EVENT_STREAM_ID}:{sequence}\n\n"
+    
+    return app.response_class(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/records/<int:record_id>/time')
 @login_required
 def get_record_time_route(record_id):
     try:
-        record = get_record_by_id(record_id)
-        if not record:
+        record_time = get_record_time(record_id)
+        if not record_time:
             return jsonify({'error': 'Record not found'}), 404
         
-        # Calculate current times including active session
-        time_todo = record['total_todo_time']
-        time_in_progress = record['total_in_progress_time']
-        time_in_review = record['total_in_review_time']
-        time_review_failed = record['total_review_failed_time']
-        
-        if record['status'] == 'TODO' and record['todo_start_time']:
-            time_todo += calculate_time_spent(record['todo_start_time'])
-        elif record['status'] == 'In Progress' and record['in_progress_start_time']:
-            time_in_progress += calculate_time_spent(record['in_progress_start_time'])
-        elif record['status'] == 'In Review' and record['in_review_start_time']:
-            time_in_review += calculate_time_spent(record['in_review_start_time'])
-        elif record['status'] == 'Review failed - In Progress' and record['review_failed_start_time']:
-            time_review_failed += calculate_time_spent(record['review_failed_start_time'])
-        
-        total_time = time_todo + time_in_progress + time_in_review + time_review_failed
-        
-        return jsonify({
-            'time_todo': time_todo,
-            'time_in_progress': time_in_progress,
-            'time_in_review': time_in_review,
-            'time_review_failed': time_review_failed,
-            'total_time': total_time
-        })
+        return jsonify(record_time)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -433,8 +657,7 @@ def get_record_time_route(record_id):
 @login_required
 def get_developers_route():
     try:
-        developers = get_users(role='developer')
-        return jsonify({'developers': developers})
+        return users_response('developers', role='developer')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -443,39 +666,37 @@ def get_developers_route():
 @role_required(['admin'])
 def export_csv():
     try:
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        # This would need to be implemented based on your date filtering needs
-        records = get_records()
-        
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow(['ID', 'Task', 'Book ID', 'Developer', 'Page Count', 'OCR', 'ETA', 'Status', 'Created By', 'Created Date', 'Published Date'])
-        
-        # Write data
-        for record in records:
-            writer.writerow([
-                record['id'],
-                record['task'],
-                record['book_id'],
-                record['developer_assignee'] or '',
-                record['page_count'] or '',
-                record['ocr'] or '',
-                record['eta'] or '',
-                record['status'],
-                record['created_by'],
-                record['created_date'],
-                record['published_date'] or ''
-            ])
-        
-        output.seek(0)
-        return output.getvalue(), 200, {
-            'Content-Type': 'text/csv',
-            'Content-Disposition': 'attachment; filename=records_export.csv'
-        }
+        start_date = request.args.get('start_date') or None
+        end_date = request.args.get('end_date') or None
+        
+        # Validate the range up front; once streaming starts errors can't be reported
+        try:
+            for value in (start_date, end_date):
+                if value:
+                    datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+        
+        def generate():
+            output = StringIO()
+            writer = csv.writer(output)
+            writer.writerow(EXPORT_CSV_HEADER)
+            
+            # One chunk of output per batch of rows
+            for rows in iter_export_rows(start_date, end_date):
+                writer.writerows(rows)
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+            yield output.getvalue()
+        
+        filename = 'records_export.csv'
+        if start_date or end_date:
+            filename = f"records_export_{start_date or 'start'}_to_{end_date or 'now'}.csv"
+        return app.response_class(generate(), mimetype='text/csv', headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            **reporting_headers()
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -513,14 +734,98 @@ def api_get_workload():
         if not date:
             date = datetime.now().strftime('%Y-%m-%d')
         
-        workload_data = get_developer_workload(date, developer)
-        activities = get_developer_daily_activities(date, developer)
+        # Today's totals grow with running timers, so they also expire with
+        # the cache's TTL for today
+        data_as_of = reporting_data_as_of()
+        parts = [date, data_as_of]
+        if date == datetime.now().strftime('%Y-%m-%d'):
+            parts.append(int(time.time() // WORKLOAD_CACHE_TODAY_TTL))
+        etag = make_etag(*parts)
+        response = not_modified(etag)
+        if response:
+            return response
         
-        return jsonify({
+        workload_data, activities = get_cached_workload(date, developer)
+        
+        return with_etag(jsonify({
             'workload': workload_data,
             'activities': activities,
             'date': date,
-            'developer': developer
+            'developer': developer,
+            'data_as_of': datetime.fromtimestamp(data_as_of).isoformat(timespec='seconds') if data_as_of else None,
+            'max_staleness_seconds': get_reporting_max_age()
+        }), etag)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Workload report for a date range and set of developers, as CSV (streamed)
+# or XLSX. XLSX needs the optional openpyxl package.
+@app.route('/export/workload')
+@login_required
+@role_required(['admin', 'lead'])
+def export_workload_report():
+    try:
+        start_date = request.args.get('start_date') or datetime.now().strftime('%Y-%m-%d')
+        end_date = request.args.get('end_date') or start_date
+        developers = [developer for developer in request.args.getlist('developer') if developer]
+        fmt = request.args.get('format', 'csv')
+        
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+        except ValueError:
+            return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+        if end < start:
+            return jsonify({'error': 'End date must not be before start date'}), 400
+        if (end - start).days >= 366:
+            return jsonify({'error': 'Reports can cover at most one year'}), 400
+        if fmt not in ('csv', 'xlsx'):
+            return jsonify({'error': 'Format must be csv or xlsx'}), 400
+        
+        summary_rows, detail_rows = get_workload_report(start_date, end_date, developers)
+        filename = f'workload-report-{start_date}' + (f'-to-{end_date}' if end_date != start_date else '')
+        
+        if fmt == 'xlsx':
+            try:
+                from openpyxl import Workbook
+            except ImportError:
+                return jsonify({'error': 'XLSX export requires the openpyxl package'}), 501
+            
+            workbook = Workbook(write_only=True)
+            for title, header, rows in (('Summary', WORKLOAD_SUMMARY_HEADER, summary_rows),
+                                        ('Detailed Activities', WORKLOAD_DETAIL_HEADER, detail_rows)):
+                sheet = workbook.create_sheet(title)
+                sheet.append(header)
+                for row in rows:
+                    sheet.append(row)
+            output = BytesIO()
+            workbook.save(output)
+            return output.getvalue(), 200, {
+                'Content-Type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                'Content-Disposition': f'attachment; filename={filename}.xlsx',
+                **reporting_headers()
+            }
+        
+        def generate():
+            output = StringIO()
+            writer = csv.writer(output)
+            writer.writerow([f'Workload Report - {start_date}' + (f' to {end_date}' if end_date != start_date else '')])
+            
+            for title, header, rows in (('Developer Workload Summary', WORKLOAD_SUMMARY_HEADER, summary_rows),
+                                        ('Detailed Activities', WORKLOAD_DETAIL_HEADER, detail_rows)):
+                writer.writerow([])
+                writer.writerow([title])
+                writer.writerow(header)
+                for i in range(0, len(rows), EXPORT_BATCH_SIZE):
+                    writer.writerows(rows[i:i + EXPORT_BATCH_SIZE])
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+            yield output.getvalue()
+        
+        return app.response_class(generate(), mimetype='text/csv', headers={
+            'Content-Disposition': f'attachment; filename={filename}.csv',
+            **reporting_headers()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -530,12 +835,18 @@ def api_get_workload():
 @role_required(['admin', 'lead'])
 def api_get_developers_for_workload():
     try:
-        developers = get_users(role='developer')
-        return jsonify({'developers': developers})
+        return users_response('developers', role='developer')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-
+# Metrics in the Prometheus text format: request latency and SQL use per
+# route, SQL statement timings, connection counts and cache hit ratios.
+# Values are per worker process.
+@app.route('/metrics')
+@login_required
+@role_required(['admin'])
+def metrics_route():
+    return app.response_class(render_metrics(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import time
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Move old Published records to the archive table; run it daily from cron or a scheduled task')
+    parser.add_argument('--days', type=float, help='archive records published more than this many days ago '
+                        '(default: ARCHIVE_AFTER_DAYS in database.py)')
+    parser.add_argument('--batch-size', type=int, help='records moved per transaction')
+    parser.add_argument('--db', default=os.environ.get('TIME_TRACKER_DB'), help='database path')
+    args = parser.parse_args()
+
+    from database import archive_published_records, configure_database, init_db
+
+    configure_database(args.db)
+    init_db()
+
+    started = time.monotonic()
+    archived = archive_published_records(args.days, args.batch_size)
+    print(f"Archived {archived} records in {time.monotonic() - started:.1f}s")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
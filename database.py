@@ -1,70 +1,829 @@
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
+import base64
+import binascii
 import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from urllib.request import pathname2url
+from metrics import Counter, Gauge, Histogram
 
-def init_db():
-    conn = sqlite3.connect('time_tracker.db')
-    c = conn.cursor()
-    
+# Database configuration. The path can be overridden with the TIME_TRACKER_DB
+# environment variable or by calling configure_database() before first use.
+DATABASE_PATH = os.environ.get('TIME_TRACKER_DB', 'time_tracker.db')
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 20000
+
+# Ids per statement in bulk updates, well under SQLite's variable limit
+BULK_BATCH_SIZE = 500
+
+# Rows per transaction in bulk imports, and how many row errors are reported
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 100
+
+# Most changed records /records/changes returns before asking for a reload
+CHANGES_LIMIT = 500
+
+# Rows fetched per batch when streaming exports
+EXPORT_BATCH_SIZE = 500
+
+# Published records older than this many days are moved to records_archive
+# by archive_published_records(), ARCHIVE_BATCH_SIZE per transaction
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 500
+
+_local = threading.local()
+_search_index_available = None
+
+# Connections a forked process inherited; see _drop_inherited_connections()
+_inherited_connections = []
+
+# Statuses whose time counts towards workload, mapped to their time keys
+TRACKED_STATUS_KEYS = {
+    'TODO': 'todo_time',
+    'In Progress': 'in_progress_time',
+    'In Review': 'in_review_time',
+    'Review failed - In Progress': 'review_failed_time'
+}
+
+# Status state machine. Each status maps to the timer that runs while a
+# record is in it (the prefix of its *_start_time and total_*_time columns),
+# or None when the status does not track time. A record can move from any
+# status to any other; entering Published also stamps published_date.
+STATUS_TIMERS = {
+    'Backlog': None,
+    'TODO': 'todo',
+    'In Progress': 'in_progress',
+    'In Review': 'in_review',
+    'Review failed - In Progress': 'review_failed',
+    'On-Hold': None,
+    'Published': None
+}
+
+# Clock for status transitions. SQLite evaluates 'now' once per statement,
+# so a transition UPDATE and the status log trigger it fires share an instant.
+NOW_SQL = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+# Workload cache, keyed by (date, developer). Entries are dropped by writes
+# in this process; WORKLOAD_CACHE_MAX_AGE bounds how stale they can get when
+# other worker processes write to the same database (None disables it).
+WORKLOAD_CACHE_SIZE = 256
+WORKLOAD_CACHE_TODAY_TTL = 30
+WORKLOAD_CACHE_MAX_AGE = 300
+
+_workload_cache = OrderedDict()
+_workload_cache_lock = threading.Lock()
+_workload_cache_generation = 0
+
+# User lists by role for the dropdown endpoints. Writes in this process drop
+# them; USERS_CACHE_MAX_AGE bounds staleness from other processes' writes.
+USERS_CACHE_MAX_AGE = 300
+
+_users_cache = {}
+_users_cache_lock = threading.Lock()
+_users_cache_generation = 0
+
+# Lookups in the in-process caches above, by cache and 'hit' or 'miss'
+cache_requests = Counter('cache_requests_total', 'In-process cache lookups', ['cache', 'result'])
+
+def _cache_hit_ratios():
+    ratios = {}
+    for cache in ('workload', 'users'):
+        hits = cache_requests.values.get((cache, 'hit'), 0)
+        total = hits + cache_requests.values.get((cache, 'miss'), 0)
+        ratios[(cache,)] = hits / total if total else None
+    return ratios
+
+Gauge('cache_hit_ratio', 'Share of cache lookups answered from the cache', _cache_hit_ratios, ['cache'])
+
+# SQL timing. Connections from _open_connection() time every statement and
+# commit, and the fetching of result rows, both in these metrics and in
+# per-thread totals that a request can read with get_sql_stats().
+SQL_DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+# Its _count series is the number of statements run
+sql_duration = Histogram('sql_statement_duration_seconds', 'Time to execute a SQL statement, not counting row fetches',
+                         ['operation'], SQL_DURATION_BUCKETS)
+sql_fetch_seconds = Counter('sql_fetch_seconds_total', 'Time spent fetching SQL result rows')
+connections_opened = Counter('db_connections_opened_total', 'Database connections opened')
+
+_open_connections = weakref.WeakSet()
+_sql_operations = {}
+
+# Slow-query log, off unless a threshold is set here, through the
+# TIME_TRACKER_SLOW_QUERY_MS environment variable or configure_slow_query_log().
+# Statements whose execution plus row fetching takes longer are kept, with
+# their query plan, in a ring buffer of the last SLOW_QUERY_LOG_SIZE.
+SLOW_QUERY_MS = float(os.environ['TIME_TRACKER_SLOW_QUERY_MS']) if os.environ.get('TIME_TRACKER_SLOW_QUERY_MS') else None
+SLOW_QUERY_LOG_SIZE = 200
+
+_slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+Gauge('db_connections_open', 'Database connections currently open', lambda: len(_open_connections))
+
+# Group commit, off unless TIME_TRACKER_GROUP_COMMIT=1 or
+# configure_group_commit(True). Writes passed to run_write() then go to one
+# writer thread per process, which applies everything queued while its last
+# batch was committing (up to GROUP_COMMIT_MAX_BATCH writes) in a single
+# transaction, after waiting GROUP_COMMIT_WAIT_MS for more to arrive.
+GROUP_COMMIT = os.environ.get('TIME_TRACKER_GROUP_COMMIT') == '1'
+GROUP_COMMIT_WAIT_MS = 0
+GROUP_COMMIT_MAX_BATCH = 100
+# Longest run_write() waits for the writer, in seconds, before giving up
+GROUP_COMMIT_RESULT_TIMEOUT = 60
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+write_batch_size = Histogram('db_write_batch_size', 'Writes committed together by the group-commit writer', (),
+                             (1, 2, 5, 10, 20, 50, 100))
+
+# Reporting snapshot, off unless REPORTING_MAX_AGE is set (in seconds) here,
+# through TIME_TRACKER_REPORTING_MAX_AGE or by configure_reporting(). Workload
+# queries and exports then read a copy of the database made with the backup
+# API and never hold read transactions on the live file. A copy older than
+# REPORTING_MAX_AGE is refreshed before use; one past half that age is
+# refreshed in the background.
+REPORTING_MAX_AGE = (float(os.environ['TIME_TRACKER_REPORTING_MAX_AGE'])
+                     if os.environ.get('TIME_TRACKER_REPORTING_MAX_AGE') else None)
+
+_reporting_refresh_lock = threading.Lock()
+_reporting_refresh_thread = None
+
+# Feed of committed record changes for push clients, numbered in publish
+# order. Only changes made by this process appear here; other processes'
+# writes show up as a new data revision.
+CHANGE_FEED_SIZE = 1000
+
+_change_feed = deque(maxlen=CHANGE_FEED_SIZE)
+_change_feed_condition = threading.Condition()
+_change_feed_sequence = 0
+
+def configure_database(path=None, busy_timeout_ms=None, cache_size_kb=None):
+    """Set connection settings; connections opened afterwards pick them up"""
+    global DATABASE_PATH, BUSY_TIMEOUT_MS, CACHE_SIZE_KB, _search_index_available
+    if path:
+        DATABASE_PATH = path
+        _search_index_available = None
+    if busy_timeout_ms is not None:
+        BUSY_TIMEOUT_MS = busy_timeout_ms
+    if cache_size_kb is not None:
+        CACHE_SIZE_KB = cache_size_kb
+    close_connection()
+
+def _record_sql(sql, seconds):
+    operation = _sql_operations.get(sql)
+    if operation is None:
+        words = sql.split(None, 1)
+        operation = words[0].upper() if words and words[0].isalpha() else 'OTHER'
+        if len(_sql_operations) < 10000:
+            _sql_operations[sql] = operation
+    sql_duration.observe(seconds, operation=operation)
+    _local.sql_statements = getattr(_local, 'sql_statements', 0) + 1
+    _local.sql_seconds = getattr(_local, 'sql_seconds', 0.0) + seconds
+
+def _record_fetch(seconds):
+    sql_fetch_seconds.inc(seconds)
+    _local.sql_seconds = getattr(_local, 'sql_seconds', 0.0) + seconds
+
+def _parameter_shape(parameters):
+    """Describe query parameters by type without their values, e.g. 'int, str x 3'"""
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{name}: {type(value).__name__}' for name, value in parameters.items()) + '}'
+    runs = []
+    for value in parameters:
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return ', '.join(name if count == 1 else f'{name} x {count}' for name, count in runs)
+
+def _query_plan(conn, sql, parameters):
+    """EXPLAIN QUERY PLAN output as indented lines, run on an untimed cursor"""
+    try:
+        c = conn.cursor(sqlite3.Cursor)
+        c.execute("EXPLAIN QUERY PLAN " + sql, parameters)
+        depths = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in c.fetchall():
+            depths[node_id] = depths.get(parent, -1) + 1
+            lines.append('  ' * depths[node_id] + detail)
+        return lines
+    except sqlite3.Error as e:
+        return [f'(no plan: {e})']
+
+def _sql_caller():
+    """The database.py function and the outside code that ran the current statement"""
+    function = caller = None
+    frame = sys._getframe(1)
+    while frame:
+        code = frame.f_code
+        if code.co_filename != __file__:
+            caller = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            break
+        # Skip the cursor's own methods and private helpers
+        if function is None and not code.co_name.startswith('_') \
+                and not isinstance(frame.f_locals.get('self'), (TimedCursor, TimedConnection)):
+            function = code.co_name
+        frame = frame.f_back
+    return function, caller
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that reports the time of each statement and fetch. While the slow
+    query log is on it also follows its current statement, logging it once
+    its time passes the threshold and updating that entry as rows are fetched.
+    """
+
+    _statement = None
+
+    def execute(self, sql, parameters=()):
+        self._statement = None
+        started = time.perf_counter()
+        try:
+            result = super().execute(sql, parameters)
+        finally:
+            seconds = time.perf_counter() - started
+            _record_sql(sql, seconds)
+        if SLOW_QUERY_MS is not None:
+            self._track(sql, parameters, _parameter_shape(parameters), seconds)
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        self._statement = None
+        tracking = SLOW_QUERY_MS is not None
+        first = ()
+        count = 0
+        
+        # Note the first parameter set, for the plan, and how many there
+        # were without consuming a lazy sequence twice
+        def remember(seq):
+            nonlocal first, count
+            for parameters in seq:
+                if not count:
+                    first = parameters
+                count += 1
+                yield parameters
+        
+        started = time.perf_counter()
+        try:
+            result = super().executemany(sql, remember(seq_of_parameters) if tracking else seq_of_parameters)
+        finally:
+            seconds = time.perf_counter() - started
+            _record_sql(sql, seconds)
+        if tracking:
+            self._track(sql, first, f"{count} x ({_parameter_shape(first)})", seconds)
+        return result
+
+    def executescript(self, sql_script):
+        self._statement = None
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            _record_sql(sql_script, time.perf_counter() - started)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(time.perf_counter() - started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(time.perf_counter() - started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(time.perf_counter() - started, len(rows))
+        return rows
+
+    def _track(self, sql, parameters, shape, seconds):
+        # Statements without a result set are complete; count what they changed
+        rows = max(self.rowcount, 0) if self.description is None else 0
+        self._statement = {'sql': sql, 'parameters': parameters, 'shape': shape,
+                           'seconds': seconds, 'rows': rows, 'entry': None}
+        self._check_slow()
+
+    def _fetched(self, seconds, rows):
+        _record_fetch(seconds)
+        statement = self._statement
+        if statement is None:
+            return
+        statement['seconds'] += seconds
+        statement['rows'] += rows
+        if statement['entry'] is None:
+            self._check_slow()
+        else:
+            statement['entry']['duration_ms'] = round(statement['seconds'] * 1000, 2)
+            statement['entry']['rows'] = statement['rows']
+
+    def _check_slow(self):
+        statement = self._statement
+        threshold = SLOW_QUERY_MS
+        if threshold is None or statement['seconds'] * 1000 < threshold:
+            return
+        function, caller = _sql_caller()
+        statement['entry'] = {
+            'logged_at': int(time.time()),
+            'duration_ms': round(statement['seconds'] * 1000, 2),
+            'rows': statement['rows'],
+            'sql': ' '.join(statement['sql'].split()),
+            'parameters': statement['shape'],
+            'function': function,
+            'caller': caller,
+            'route': getattr(_local, 'sql_context', None),
+            'plan': _query_plan(self.connection, statement['sql'], statement['parameters'])
+        }
+        _slow_queries.append(statement['entry'])
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors, shortcut statements and commits are timed"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            _record_sql('COMMIT', time.perf_counter() - started)
+
+    def close(self):
+        _open_connections.discard(self)
+        return super().close()
+
+def reset_sql_stats(context=None):
+    """
+    Start counting SQL statements and time for the current thread afresh.
+    context (such as the request's route) is shown with slow queries.
+    """
+    _local.sql_statements = 0
+    _local.sql_seconds = 0.0
+    _local.sql_context = context
+
+def get_sql_stats():
+    """(statements, seconds) of SQL run by the current thread since reset_sql_stats()"""
+    return getattr(_local, 'sql_statements', 0), getattr(_local, 'sql_seconds', 0.0)
+
+def configure_slow_query_log(threshold_ms=None, size=None):
+    """Log statements slower than threshold_ms (None turns the log off), keeping the last `size`"""
+    global SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE, _slow_queries
+    SLOW_QUERY_MS = threshold_ms
+    if size is not None and size != SLOW_QUERY_LOG_SIZE:
+        SLOW_QUERY_LOG_SIZE = size
+        _slow_queries = deque(_slow_queries, maxlen=size)
+
+def get_slow_query_log_settings():
+    return {'threshold_ms': SLOW_QUERY_MS, 'size': SLOW_QUERY_LOG_SIZE}
+
+def get_slow_queries():
+    """Logged slow statements, newest first"""
+    return list(reversed(_slow_queries))
+
+def clear_slow_queries():
+    _slow_queries.clear()
+
+def _open_connection():
+    conn = sqlite3.connect(DATABASE_PATH, timeout=BUSY_TIMEOUT_MS / 1000, factory=TimedConnection)
+    _open_connections.add(conn)
+    connections_opened.inc()
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size=-{int(CACHE_SIZE_KB)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.create_function('fold_case', 1, fold_case, deterministic=True)
+    return conn
+
+def _drop_inherited_connections():
+    """
+    Forget connections opened before this process was forked (a server
+    preloading the app, then forking workers). A SQLite connection must not
+    be used across fork(), and closing it here could checkpoint or remove the
+    parent's WAL, so it is kept referenced and never touched again.
+    """
+    if getattr(_local, 'pid', None) == os.getpid():
+        return
+    for name in ('conn', 'reporting_conn'):
+        conn = getattr(_local, name, None)
+        if conn is not None:
+            _inherited_connections.append(conn)
+            _open_connections.discard(conn)
+            setattr(_local, name, None)
+    _local.pid = os.getpid()
+
+def get_connection():
+    """
+    Return the connection owned by the current thread, opening it on first use
+    and again in a forked child. Any transaction left open by a failed earlier
+    call is rolled back so every caller starts from a clean state, except
+    inside a group-commit batch.
+    """
+    _drop_inherited_connections()
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.path != DATABASE_PATH:
+        close_connection()
+        conn = _open_connection()
+        _local.conn = conn
+        _local.path = DATABASE_PATH
+    elif conn.in_transaction and getattr(_local, 'write_batch', None) is None:
+        conn.rollback()
+    return conn
+
+def close_connection():
+    """Close the current thread's connections, if it has any"""
+    _drop_inherited_connections()
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+    conn = getattr(_local, 'reporting_conn', None)
+    if conn is not None:
+        conn.close()
+        _local.reporting_conn = None
+
+def configure_reporting(max_age=None):
+    """Read reports from a snapshot at most max_age seconds old; None reads the live database"""
+    global REPORTING_MAX_AGE
+    REPORTING_MAX_AGE = max_age
+
+def reporting_snapshot_path():
+    return DATABASE_PATH + '.reporting'
+
+def refresh_reporting_snapshot():
+    """
+    Copy the database to the reporting snapshot with the backup API. Under
+    WAL the copy reads one consistent version without blocking writers. It
+    is written next to the snapshot and renamed over it, so connections on
+    the old snapshot finish their reads undisturbed. The file's mtime is set
+    to when the copy started, the time its data is current to.
+    """
+    path = reporting_snapshot_path()
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    started = time.time()
+    try:
+        source = _open_connection()
+        try:
+            target = sqlite3.connect(temp_path)
+            try:
+                source.backup(target)
+                target.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                target.close()
+        finally:
+            source.close()
+        os.utime(temp_path, (started, started))
+        os.replace(temp_path, path)
+    except BaseException:
+        # Don't leave a partial copy of the database behind
+        for leftover in (temp_path, temp_path + '-journal'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+
+def _reporting_snapshot_stat():
+    try:
+        return os.stat(reporting_snapshot_path())
+    except FileNotFoundError:
+        return None
+
+def _refresh_reporting_snapshot_once(max_age):
+    """Refresh unless another thread did while we waited for the lock"""
+    with _reporting_refresh_lock:
+        snapshot = _reporting_snapshot_stat()
+        if snapshot is None or time.time() - snapshot.st_mtime >= max_age:
+            refresh_reporting_snapshot()
+
+def _refresh_in_background(max_age):
+    global _reporting_refresh_thread
+    with _reporting_refresh_lock:
+        if _reporting_refresh_thread is not None and _reporting_refresh_thread.is_alive():
+            return
+        _reporting_refresh_thread = threading.Thread(
+            target=_refresh_reporting_snapshot_once, args=(max_age / 2,), name='reporting-refresh', daemon=True)
+        _reporting_refresh_thread.start()
+
+def _fresh_reporting_snapshot(max_age):
+    """Stat of a snapshot no older than max_age, refreshing it first if needed"""
+    snapshot = _reporting_snapshot_stat()
+    age = time.time() - snapshot.st_mtime if snapshot else None
+    if age is None or age >= max_age:
+        _refresh_reporting_snapshot_once(max_age)
+        snapshot = _reporting_snapshot_stat()
+    elif age >= max_age / 2:
+        _refresh_in_background(max_age)
+    return snapshot
+
+def get_reporting_max_age():
+    """Staleness bound in seconds for reports, or None when they read live data"""
+    return REPORTING_MAX_AGE
+
+def reporting_data_as_of():
+    """
+    Epoch seconds the data reports read is current to: the snapshot's time
+    when reporting is configured, otherwise None (live data).
+    """
+    max_age = REPORTING_MAX_AGE
+    if max_age is None:
+        return None
+    return int(_fresh_reporting_snapshot(max_age).st_mtime)
+
+def get_reporting_connection():
+    """
+    Connection for reporting reads: a read-only one on a snapshot no older
+    than REPORTING_MAX_AGE when reporting is configured, otherwise the
+    thread's live connection.
+    """
+    max_age = REPORTING_MAX_AGE
+    if max_age is None:
+        return get_connection()
+    
+    snapshot = _fresh_reporting_snapshot(max_age)
+    
+    # Reopen when the snapshot file has been replaced
+    identity = (snapshot.st_ino, snapshot.st_mtime_ns)
+    _drop_inherited_connections()
+    conn = getattr(_local, 'reporting_conn', None)
+    if conn is None or _local.reporting_snapshot != identity or _local.reporting_path != reporting_snapshot_path():
+        if conn is not None:
+            conn.close()
+        conn = _open_reporting_connection()
+        _local.reporting_conn = conn
+        _local.reporting_snapshot = identity
+        _local.reporting_path = reporting_snapshot_path()
+    return conn
+
+def _reporting_export_connection():
+    """A connection of its own on a fresh enough snapshot, for long streamed reads"""
+    get_reporting_connection()
+    return _open_reporting_connection()
+
+def _open_reporting_connection():
+    uri = f'file:{pathname2url(os.path.abspath(reporting_snapshot_path()))}?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, factory=TimedConnection)
+    _open_connections.add(conn)
+    connections_opened.inc()
+    conn.execute(f"PRAGMA cache_size=-{int(CACHE_SIZE_KB)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.create_function('fold_case', 1, fold_case, deterministic=True)
+    return conn
+
+# Table definitions. Instants are stored as integer epoch seconds and
+# durations (the total_*_time columns) as integer seconds.
+USERS_TABLE_SQL = '''
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('admin', 'lead', 'developer')),
+        created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+    )
+'''
+
+RECORDS_TABLE_SQL = '''
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task TEXT NOT NULL,
+        book_id TEXT NOT NULL,
+        developer_assignee TEXT,
+        page_count INTEGER,
+        ocr TEXT CHECK(ocr IN ('yes', 'no')),
+        eta DATE,
+        status TEXT NOT NULL CHECK(status IN ('Backlog', 'TODO', 'In Progress', 'In Review', 'Published', 'On-Hold', 'Review failed - In Progress')),
+        created_by TEXT NOT NULL,
+        created_date INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+        published_date INTEGER,
+        todo_start_time INTEGER,
+        in_progress_start_time INTEGER,
+        in_review_start_time INTEGER,
+        review_failed_start_time INTEGER,
+        total_todo_time INTEGER DEFAULT 0,
+        total_in_progress_time INTEGER DEFAULT 0,
+        total_in_review_time INTEGER DEFAULT 0,
+        total_review_failed_time INTEGER DEFAULT 0,
+        row_version INTEGER DEFAULT 0,
+        FOREIGN KEY (developer_assignee) REFERENCES users (username),
+        FOREIGN KEY (created_by) REFERENCES users (username)
+    )
+'''
+
+# Append-only log of status transitions. Each row closes the interval
+# [status_started_at, changed_at) that the record spent in from_status.
+STATUS_EVENTS_TABLE_SQL = '''
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        record_id INTEGER NOT NULL,
+        developer_assignee TEXT,
+        from_status TEXT,
+        to_status TEXT NOT NULL,
+        status_started_at INTEGER,
+        changed_at INTEGER NOT NULL
+    )
+'''
+
+# Logs every status change on records from within the UPDATE that made it,
+# closing the interval the record spent in its old status
+STATUS_LOG_TRIGGER_SQL = f'''
+    CREATE TRIGGER IF NOT EXISTS records_status_log
+    AFTER UPDATE OF status ON records WHEN old.status IS NOT new.status BEGIN
+        INSERT INTO record_status_events
+        (record_id, developer_assignee, from_status, to_status, status_started_at, changed_at)
+        VALUES (new.id, old.developer_assignee, old.status, new.status,
+                CASE old.status {' '.join(f"WHEN '{status}' THEN old.{timer}_start_time"
+                                          for status, timer in STATUS_TIMERS.items() if timer)} END,
+                {NOW_SQL});
+    END
+'''
+
+# Single-row counter bumped by triggers on every insert, update and delete
+# of the tables below, so any process can tell whether data has changed
+DATA_REVISION_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS data_revision (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        revision INTEGER NOT NULL
+    )
+'''
+DATA_REVISION_TABLES = ['users']
+
+# Deleted records, kept so clients syncing by revision learn about deletes
+TOMBSTONES_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS record_tombstones (
+        record_id INTEGER PRIMARY KEY,
+        developer_assignee TEXT,
+        row_version INTEGER NOT NULL
+    )
+'''
+
+# Record writes bump the data revision and stamp the row (or its tombstone)
+# with it, so row_version only ever grows. The update trigger names every
+# column except row_version, which its own stamping update then leaves alone.
+RECORD_VERSION_TRIGGERS_SQL = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS records_version_insert AFTER INSERT ON records BEGIN
+        UPDATE data_revision SET revision = revision + 1 WHERE id = 1;
+        UPDATE records SET row_version = (SELECT revision FROM data_revision WHERE id = 1) WHERE id = new.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS records_version_update AFTER UPDATE OF {columns} ON records BEGIN
+        UPDATE data_revision SET revision = revision + 1 WHERE id = 1;
+        UPDATE records SET row_version = (SELECT revision FROM data_revision WHERE id = 1) WHERE id = new.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS records_version_delete AFTER DELETE ON records BEGIN
+        UPDATE data_revision SET revision = revision + 1 WHERE id = 1;
+        INSERT OR REPLACE INTO record_tombstones (record_id, developer_assignee, row_version)
+        VALUES (old.id, old.developer_assignee, (SELECT revision FROM data_revision WHERE id = 1));
+    END
+    '''
+]
+
+# SQL expressions converting the old text timestamps and hour totals.
+# CURRENT_TIMESTAMP defaults were UTC; values written from datetime.now()
+# were local time.
+def _utc_text_to_epoch(column):
+    return f"CAST(strftime('%s', {column}) AS INTEGER)"
+
+def _local_text_to_epoch(column):
+    return f"CAST(strftime('%s', {column}, 'utc') AS INTEGER)"
+
+def _hours_to_seconds(column):
+    return f"CAST(ROUND(COALESCE({column}, 0) * 3600) AS INTEGER)"
+
+def _column_type(c, table, column):
+    c.execute(f"PRAGMA table_info({table})")
+    for row in c.fetchall():
+        if row[1] == column:
+            return row[2].upper()
+    return None
+
+def _rebuild_table(c, name, create_sql, columns, select_exprs):
+    """Recreate a table from create_sql, copying rows through select_exprs"""
+    c.execute(f"DROP TABLE IF EXISTS {name}_new")
+    c.execute(create_sql.format(name=f'{name}_new'))
+    c.execute(f"INSERT INTO {name}_new ({', '.join(columns)}) SELECT {', '.join(select_exprs)} FROM {name}")
+    c.execute(f"DROP TABLE {name}")
+    c.execute(f"ALTER TABLE {name}_new RENAME TO {name}")
+
+def _migrate_baseline(c):
+    """
+    Migration 1: create the schema, or bring a database from any earlier
+    layout up to it. These checks used to run on every start.
+    """
     # Users table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            role TEXT NOT NULL CHECK(role IN ('admin', 'lead', 'developer')),
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
+    if not c.fetchone():
+        c.execute(USERS_TABLE_SQL.format(name='users'))
+    elif _column_type(c, 'users', 'created_at') != 'INTEGER':
+        print("Converting users.created_at to epoch seconds...")
+        _rebuild_table(
+            c, 'users', USERS_TABLE_SQL,
+            ['id', 'username', 'password', 'role', 'created_at'],
+            ['id', 'username', 'password', 'role', _utc_text_to_epoch('created_at')]
         )
-    ''')
     
-    # Records table - Create with new status options
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS records_new (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task TEXT NOT NULL,
-            book_id TEXT NOT NULL,
-            developer_assignee TEXT,
-            page_count INTEGER,
-            ocr TEXT CHECK(ocr IN ('yes', 'no')),
-            eta DATE,
-            status TEXT NOT NULL CHECK(status IN ('Backlog', 'TODO', 'In Progress', 'In Review', 'Published', 'On-Hold', 'Review failed - In Progress')),
-            created_by TEXT NOT NULL,
-            created_date DATETIME DEFAULT CURRENT_TIMESTAMP,
-            published_date DATETIME,
-            todo_start_time DATETIME,
-            in_progress_start_time DATETIME,
-            in_review_start_time DATETIME,
-            review_failed_start_time DATETIME,
-            total_todo_time REAL DEFAULT 0,
-            total_in_progress_time REAL DEFAULT 0,
-            total_in_review_time REAL DEFAULT 0,
-            total_review_failed_time REAL DEFAULT 0,
-            FOREIGN KEY (developer_assignee) REFERENCES users (username),
-            FOREIGN KEY (created_by) REFERENCES users (username)
-        )
-    ''')
+    # Records table - create it, migrate it from the old status options, or
+    # bring an existing one up to date
+    c.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='records'")
+    existing_records = c.fetchone()
+    records_rebuilt = True
     
-    # Check if old records table exists and migrate data
-    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='records'")
-    if c.fetchone():
+    if existing_records is None:
+        c.execute(RECORDS_TABLE_SQL.format(name='records'))
+    elif 'Review failed - In Progress' not in existing_records[0]:
         print("Migrating data from old records table to new one...")
-        # Copy data from old table to new table
-        c.execute('''
-            INSERT INTO records_new 
-            (id, task, book_id, developer_assignee, page_count, ocr, eta, status, 
-             created_by, created_date, published_date, todo_start_time, in_progress_start_time,
-             total_todo_time, total_in_progress_time)
-            SELECT 
-            id, task, book_id, developer_assignee, page_count, ocr, eta, status,
-            created_by, created_date, published_date, todo_start_time, in_progress_start_time,
-            total_todo_time, total_in_progress_time
-            FROM records
-        ''')
-        # Drop old table
-        c.execute("DROP TABLE records")
-        # Rename new table
-        c.execute("ALTER TABLE records_new RENAME TO records")
+        _rebuild_table(
+            c, 'records', RECORDS_TABLE_SQL,
+            ['id', 'task', 'book_id', 'developer_assignee', 'page_count', 'ocr', 'eta', 'status',
+             'created_by', 'created_date', 'published_date', 'todo_start_time', 'in_progress_start_time',
+             'total_todo_time', 'total_in_progress_time'],
+            ['id', 'task', 'book_id', 'developer_assignee', 'page_count', 'ocr', 'eta', 'status',
+             'created_by', _utc_text_to_epoch('created_date'), _local_text_to_epoch('published_date'),
+             _local_text_to_epoch('todo_start_time'), _local_text_to_epoch('in_progress_start_time'),
+             _hours_to_seconds('total_todo_time'), _hours_to_seconds('total_in_progress_time')]
+        )
         print("Data migration completed successfully")
+    else:
+        records_rebuilt = False
+        
+        # Add new columns if they don't exist
+        c.execute("PRAGMA table_info(records)")
+        columns = [column[1] for column in c.fetchall()]
+        
+        if 'todo_start_time' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN todo_start_time DATETIME")
+            print("Added todo_start_time column")
+        
+        if 'in_progress_start_time' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN in_progress_start_time DATETIME")
+            print("Added in_progress_start_time column")
+        
+        if 'in_review_start_time' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN in_review_start_time DATETIME")
+            print("Added in_review_start_time column")
+        
+        if 'review_failed_start_time' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN review_failed_start_time DATETIME")
+            print("Added review_failed_start_time column")
+        
+        if 'total_todo_time' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN total_todo_time REAL DEFAULT 0")
+            print("Added total_todo_time column")
+        
+        if 'total_in_progress_time' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN total_in_progress_time REAL DEFAULT 0")
+            print("Added total_in_progress_time column")
+        
+        if 'total_in_review_time' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN total_in_review_time REAL DEFAULT 0")
+            print("Added total_in_review_time column")
+        
+        if 'total_review_failed_time' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN total_review_failed_time REAL DEFAULT 0")
+            print("Added total_review_failed_time column")
+        
+        if 'row_version' not in columns:
+            c.execute("ALTER TABLE records ADD COLUMN row_version INTEGER DEFAULT 0")
+            print("Added row_version column")
+        
+        # One-time conversion of text timestamps and hour totals
+        if _column_type(c, 'records', 'created_date') != 'INTEGER':
+            print("Converting records timestamps to epoch seconds...")
+            _rebuild_table(
+                c, 'records', RECORDS_TABLE_SQL,
+                ['id', 'task', 'book_id', 'developer_assignee', 'page_count', 'ocr', 'eta', 'status',
+                 'created_by', 'created_date', 'published_date', 'todo_start_time', 'in_progress_start_time',
+                 'in_review_start_time', 'review_failed_start_time', 'total_todo_time',
+                 'total_in_progress_time', 'total_in_review_time', 'total_review_failed_time'],
+                ['id', 'task', 'book_id', 'developer_assignee', 'page_count', 'ocr', 'eta', 'status',
+                 'created_by', _utc_text_to_epoch('created_date'), _local_text_to_epoch('published_date'),
+                 _local_text_to_epoch('todo_start_time'), _local_text_to_epoch('in_progress_start_time'),
+                 _local_text_to_epoch('in_review_start_time'), _local_text_to_epoch('review_failed_start_time'),
+                 _hours_to_seconds('total_todo_time'), _hours_to_seconds('total_in_progress_time'),
+                 _hours_to_seconds('total_in_review_time'), _hours_to_seconds('total_review_failed_time')]
+            )
+            records_rebuilt = True
     
     # Insert default admin user if not exists
     c.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'")
@@ -75,50 +834,256 @@ def init_db():
             ('admin', admin_password, 'admin')
         )
     
-    # Add new columns if they don't exist
+    # Indexes for the dashboard filters, the created_date sort and the
+    # workload date ranges
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_created_date ON records (created_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_status_created ON records (status, created_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_assignee_created ON records (developer_assignee, created_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_created_by ON records (created_by, created_date)")
+    
+    # Status transition log
+    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='record_status_events'")
+    if not c.fetchone():
+        c.execute(STATUS_EVENTS_TABLE_SQL.format(name='record_status_events'))
+    elif _column_type(c, 'record_status_events', 'changed_at') != 'INTEGER':
+        print("Converting record_status_events timestamps to epoch seconds...")
+        _rebuild_table(
+            c, 'record_status_events', STATUS_EVENTS_TABLE_SQL,
+            ['id', 'record_id', 'developer_assignee', 'from_status', 'to_status', 'status_started_at', 'changed_at'],
+            ['id', 'record_id', 'developer_assignee', 'from_status', 'to_status',
+             _local_text_to_epoch('status_started_at'), _local_text_to_epoch('changed_at')]
+        )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_status_events_changed_at ON record_status_events (changed_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_status_events_developer ON record_status_events (developer_assignee, changed_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_status_events_record ON record_status_events (record_id, changed_at)")
+    c.execute(STATUS_LOG_TRIGGER_SQL)
+    
+    # Data revision counter for conditional requests
+    c.execute(DATA_REVISION_TABLE_SQL)
+    c.execute("INSERT OR IGNORE INTO data_revision (id, revision) VALUES (1, 0)")
+    for table in DATA_REVISION_TABLES:
+        for operation in ('INSERT', 'UPDATE', 'DELETE'):
+            c.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_revision_{operation.lower()}
+                AFTER {operation} ON {table} BEGIN
+                    UPDATE data_revision SET revision = revision + 1 WHERE id = 1;
+                END
+            ''')
+    
+    # Row versions and tombstones for delta sync. These replace the plain
+    # revision triggers records had before.
+    c.execute(TOMBSTONES_TABLE_SQL)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_record_tombstones_version ON record_tombstones (row_version)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_records_row_version ON records (row_version)")
+    for operation in ('insert', 'update', 'delete'):
+        c.execute(f"DROP TRIGGER IF EXISTS records_revision_{operation}")
     c.execute("PRAGMA table_info(records)")
-    columns = [column[1] for column in c.fetchall()]
+    versioned_columns = [column[1] for column in c.fetchall() if column[1] not in ('id', 'row_version')]
+    for trigger_sql in RECORD_VERSION_TRIGGERS_SQL:
+        c.execute(trigger_sql.replace('{columns}', ', '.join(versioned_columns)))
     
-    if 'todo_start_time' not in columns:
-        c.execute("ALTER TABLE records ADD COLUMN todo_start_time DATETIME")
-        print("Added todo_start_time column")
+    # Full-text search index over task, book ID and assignee
+    init_search_index(c, rebuild=records_rebuilt)
+
+def _migrate_archive(c):
+    """
+    Migration 2: records_archive, the cold copy of old Published records,
+    with the same columns as records, and the archived flag on tombstones.
+    """
+    c.execute(RECORDS_TABLE_SQL.format(name='records_archive'))
+    c.execute("CREATE INDEX idx_records_archive_created_date ON records_archive (created_date)")
+    c.execute("CREATE INDEX idx_records_archive_assignee_created ON records_archive (developer_assignee, created_date)")
+    c.execute("CREATE INDEX idx_records_archive_published ON records_archive (published_date)")
+    c.execute("ALTER TABLE record_tombstones ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
     
-    if 'in_progress_start_time' not in columns:
-        c.execute("ALTER TABLE records ADD COLUMN in_progress_start_time DATETIME")
-        print("Added in_progress_start_time column")
+    # Deleting an archived record turns its tombstone into a delete
+    c.execute('''
+        CREATE TRIGGER records_archive_delete AFTER DELETE ON records_archive BEGIN
+            UPDATE data_revision SET revision = revision + 1 WHERE id = 1;
+            INSERT OR REPLACE INTO record_tombstones (record_id, developer_assignee, row_version)
+            VALUES (old.id, old.developer_assignee, (SELECT revision FROM data_revision WHERE id = 1));
+        END
+    ''')
+
+def _migrate_event_durations(c):
+    """
+    Migration 3: index interval lengths in record_status_events so the
+    longest one is a single index lookup (see get_status_intervals).
+    """
+    c.execute("CREATE INDEX idx_status_events_duration ON record_status_events (changed_at - status_started_at)")
+
+def _migrate_archive_created_by(c):
+    """
+    Migration 4: index records_archive on created_by like records, so the
+    archive's share of a page count reads the index instead of the table.
+    """
+    c.execute("CREATE INDEX idx_records_archive_created_by ON records_archive (created_by, created_date)")
+
+# Schema migrations, applied in order by migrate() and recorded in PRAGMA
+# user_version. Add new ones at the end with the next number and never change
+# one that has shipped. A migration that adds a records column must also add
+# it to records_archive and recreate records_version_update so the column
+# bumps row_version.
+MIGRATIONS = [
+    (1, 'Baseline schema', _migrate_baseline),
+    (2, 'Archive table for published records', _migrate_archive),
+    (3, 'Index status event durations', _migrate_event_durations),
+    (4, 'Index archived records by creator', _migrate_archive_created_by),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version():
+    """The migration number the database is at (PRAGMA user_version)"""
+    c = get_connection().cursor()
+    c.execute("PRAGMA user_version")
+    return c.fetchone()[0]
+
+def pending_migrations():
+    """(version, description) of the migrations the database still needs"""
+    version = get_schema_version()
+    return [(number, description) for number, description, _ in MIGRATIONS if number > version]
+
+def migrate():
+    """
+    Apply pending migrations, each followed by its user_version, in one
+    transaction under an exclusive lock so concurrent workers cannot both
+    migrate. Returns the (version, description) pairs applied.
+    """
+    if get_schema_version() >= SCHEMA_VERSION:
+        return []
     
-    if 'in_review_start_time' not in columns:
-        c.execute("ALTER TABLE records ADD COLUMN in_review_start_time DATETIME")
-        print("Added in_review_start_time column")
+    conn = get_connection()
+    c = conn.cursor()
+    applied = []
+    try:
+        c.execute("BEGIN EXCLUSIVE")
+        # Another process may have migrated while we waited for the lock
+        c.execute("PRAGMA user_version")
+        version = c.fetchone()[0]
+        for number, description, migration in MIGRATIONS:
+            if number <= version:
+                continue
+            print(f"Applying migration {number}: {description}")
+            migration(c)
+            c.execute(f"PRAGMA user_version = {number}")
+            applied.append((number, description))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
     
-    if 'review_failed_start_time' not in columns:
-        c.execute("ALTER TABLE records ADD COLUMN review_failed_start_time DATETIME")
-        print("Added review_failed_start_time column")
+    if applied:
+        c.execute("PRAGMA optimize")
+    return applied
+
+def init_db():
+    """Migrate the database to SCHEMA_VERSION; when it is already there this is a single PRAGMA read"""
+    migrate()
+
+def get_data_revision():
+    """Current data revision; it changes whenever records or users are written"""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("SELECT revision FROM data_revision WHERE id = 1")
+    row = c.fetchone()
+    return row[0] if row else 0
+
+def init_search_index(c, rebuild=False):
+    """
+    Create the records_fts trigram index and the triggers that keep it in sync
+    with records. Returns False when this SQLite build has no FTS5 trigram
+    tokenizer, in which case searches keep using LIKE.
+    """
+    global _search_index_available
     
-    if 'total_todo_time' not in columns:
-        c.execute("ALTER TABLE records ADD COLUMN total_todo_time REAL DEFAULT 0")
-        print("Added total_todo_time column")
+    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='records_fts'")
+    exists = c.fetchone() is not None
     
-    if 'total_in_progress_time' not in columns:
-        c.execute("ALTER TABLE records ADD COLUMN total_in_progress_time REAL DEFAULT 0")
-        print("Added total_in_progress_time column")
+    if not exists:
+        try:
+            c.execute('''
+                CREATE VIRTUAL TABLE records_fts USING fts5(
+                    task, book_id, developer_assignee,
+                    content='records', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, falling back to LIKE: {e}")
+            _search_index_available = False
+            return False
+        rebuild = True
     
-    if 'total_in_review_time' not in columns:
-        c.execute("ALTER TABLE records ADD COLUMN total_in_review_time REAL DEFAULT 0")
-        print("Added total_in_review_time column")
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+            INSERT INTO records_fts (rowid, task, book_id, developer_assignee)
+            VALUES (new.id, new.task, new.book_id, new.developer_assignee);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+            INSERT INTO records_fts (records_fts, rowid, task, book_id, developer_assignee)
+            VALUES ('delete', old.id, old.task, old.book_id, old.developer_assignee);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS records_fts_update
+        AFTER UPDATE OF task, book_id, developer_assignee ON records BEGIN
+            INSERT INTO records_fts (records_fts, rowid, task, book_id, developer_assignee)
+            VALUES ('delete', old.id, old.task, old.book_id, old.developer_assignee);
+            INSERT INTO records_fts (rowid, task, book_id, developer_assignee)
+            VALUES (new.id, new.task, new.book_id, new.developer_assignee);
+        END
+    ''')
     
-    if 'total_review_failed_time' not in columns:
-        c.execute("ALTER TABLE records ADD COLUMN total_review_failed_time REAL DEFAULT 0")
-        print("Added total_review_failed_time column")
+    if rebuild:
+        c.execute("INSERT INTO records_fts (records_fts) VALUES ('rebuild')")
+        print("Rebuilt records search index")
     
-    conn.commit()
-    conn.close()
+    _search_index_available = True
+    return True
+
+def search_index_available():
+    """Whether the records_fts index exists in the configured database"""
+    global _search_index_available
+    if _search_index_available is None:
+        c = get_connection().cursor()
+        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='records_fts'")
+        _search_index_available = c.fetchone() is not None
+    return _search_index_available
+
+def fold_case(value):
+    """
+    Lower-case text one character at a time, as the FTS5 trigram tokenizer
+    folds it (so non-ASCII letters too, and a final sigma like any other).
+    Registered on every connection as the SQL function fold_case().
+    """
+    if value is None:
+        return None
+    return ''.join(map(str.lower, str(value)))
+
+def build_search_condition(search, indexed=True):
+    """
+    Return (sql, params) matching records whose task, book ID or assignee
+    contains the search text, ignoring case as fold_case() does. Terms of
+    three or more characters go through the trigram index; shorter terms and
+    terms with LIKE wildcards use LIKE on the folded columns, as does
+    indexed=False (for records_archive, which the index does not cover).
+    Both ways find the same records.
+    """
+    if indexed and len(search) >= 3 and '%' not in search and '_' not in search and search_index_available():
+        phrase = '"' + search.replace('"', '""') + '"'
+        return "r.id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)", [phrase]
+    
+    # SQLite's LIKE only ignores case for ASCII, so fold both sides first
+    pattern = f'%{fold_case(search)}%'
+    return ("(fold_case(r.task) LIKE ? OR fold_case(r.book_id) LIKE ? OR fold_case(r.developer_assignee) LIKE ?)",
+            [pattern, pattern, pattern])
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 def verify_user(username, password):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     hashed_password = hash_password(password)
@@ -128,14 +1093,13 @@ def verify_user(username, password):
     )
     
     user = c.fetchone()
-    conn.close()
     
     if user:
         return {'username': user[0], 'role': user[1]}
     return None
 
 def get_users(role=None):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     if role:
@@ -144,11 +1108,42 @@ def get_users(role=None):
         c.execute("SELECT username, role, created_at FROM users ORDER BY username")
     
     users = [{'username': row[0], 'role': row[1], 'created_at': row[2]} for row in c.fetchall()]
-    conn.close()
     return users
 
+def get_cached_users(role=None):
+    """
+    Return (users, version) as get_users(role) would, from a cache that
+    create_user, update_user and delete_user invalidate. version is a digest
+    of the list, usable as a validator. The returned list is shared and must
+    not be modified.
+    """
+    with _users_cache_lock:
+        entry = _users_cache.get(role)
+        if entry and time.monotonic() - entry[0] < USERS_CACHE_MAX_AGE:
+            cache_requests.inc(cache='users', result='hit')
+            return entry[1], entry[2]
+        cache_requests.inc(cache='users', result='miss')
+        generation = _users_cache_generation
+    
+    cached_at = time.monotonic()
+    users = get_users(role)
+    version = hashlib.sha1(json.dumps(users).encode()).hexdigest()
+    
+    with _users_cache_lock:
+        # Skip storing if a write invalidated the cache while we read
+        if generation == _users_cache_generation:
+            _users_cache[role] = (cached_at, users, version)
+    
+    return users, version
+
+def invalidate_users_cache():
+    global _users_cache_generation
+    with _users_cache_lock:
+        _users_cache_generation += 1
+        _users_cache.clear()
+
 def create_user(username, password, role):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     try:
@@ -159,15 +1154,15 @@ def create_user(username, password, role):
         )
         conn.commit()
         success = True
+        invalidate_users_cache()
     except sqlite3.IntegrityError:
+        conn.rollback()
         success = False
-    finally:
-        conn.close()
     
     return success
 
 def change_password(username, new_password):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     hashed_password = hash_password(new_password)
@@ -177,10 +1172,9 @@ def change_password(username, new_password):
     )
     
     conn.commit()
-    conn.close()
 
 def update_user(old_username, new_username, new_role):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     try:
@@ -190,34 +1184,44 @@ def update_user(old_username, new_username, new_role):
         )
         
         # Also update any records that reference this user
-        c.execute(
-            "UPDATE records SET developer_assignee = ? WHERE developer_assignee = ?",
-            (new_username, old_username)
-        )
+        for table in ('records', 'records_archive'):
+            c.execute(
+                f"UPDATE {table} SET developer_assignee = ? WHERE developer_assignee = ?",
+                (new_username, old_username)
+            )
+            
+            c.execute(
+                f"UPDATE {table} SET created_by = ? WHERE created_by = ?",
+                (new_username, old_username)
+            )
         
         c.execute(
-            "UPDATE records SET created_by = ? WHERE created_by = ?",
+            "UPDATE record_status_events SET developer_assignee = ? WHERE developer_assignee = ?",
             (new_username, old_username)
         )
         
         conn.commit()
         success = True
+        invalidate_workload_cache([old_username, new_username])
+        invalidate_users_cache()
+        publish_record_change('updated')
     except sqlite3.Error as e:
+        conn.rollback()
         print(f"Database error: {e}")
         success = False
-    finally:
-        conn.close()
     
     return success
 
 def delete_user(username):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     try:
         # Check if user has any records
-        c.execute("SELECT COUNT(*) FROM records WHERE created_by = ? OR developer_assignee = ?", 
-                 (username, username))
+        c.execute('''
+            SELECT (SELECT COUNT(*) FROM records WHERE created_by = ? OR developer_assignee = ?)
+                 + (SELECT COUNT(*) FROM records_archive WHERE created_by = ? OR developer_assignee = ?)
+        ''', (username, username, username, username))
         record_count = c.fetchone()[0]
         
         if record_count > 0:
@@ -228,15 +1232,15 @@ def delete_user(username):
         c.execute("DELETE FROM users WHERE username = ?", (username,))
         conn.commit()
         success = True
+        invalidate_users_cache()
     except sqlite3.Error:
+        conn.rollback()
         success = False
-    finally:
-        conn.close()
     
     return success
 
 def create_record(task, book_id, created_by, developer_assignee=None, page_count=None, ocr=None, eta=None):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     c.execute('''
@@ -245,27 +1249,321 @@ def create_record(task, book_id, created_by, developer_assignee=None, page_count
     ''', (task, book_id, developer_assignee, page_count, ocr, eta, created_by))
     
     record_id = c.lastrowid
-    conn.commit()
-    conn.close()
+    log_status_event(c, record_id, developer_assignee, None, 'Backlog', None, int(time.time()))
+    _commit(conn)
+    _after_commit(invalidate_workload_cache, [developer_assignee], [datetime.now().strftime('%Y-%m-%d')])
+    _after_commit(publish_record_change, 'created', record_id, [developer_assignee])
     return record_id
 
-def update_record(record_id, task=None, book_id=None, developer_assignee=None, page_count=None, ocr=None, eta=None, status=None):
-    conn = sqlite3.connect('time_tracker.db')
+def _parse_import_row(row, developers):
+    """
+    Validate one imported row against the records constraints and return its
+    column values, raising ValueError with a message for the first problem.
+    Empty strings count as missing values.
+    """
+    if not isinstance(row, dict):
+        raise ValueError('Row must be an object')
+    
+    def field(name):
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        return None if value in ('', None) else value
+    
+    task = field('task')
+    book_id = field('book_id')
+    if task is None or book_id is None:
+        raise ValueError('Task and Book ID are required')
+    
+    developer_assignee = field('developer_assignee')
+    if developer_assignee is not None and developer_assignee not in developers:
+        raise ValueError(f'Unknown developer: {developer_assignee}')
+    
+    page_count = field('page_count')
+    if page_count is not None:
+        # int() would truncate a JSON number such as 12.7, so only take whole ones
+        if isinstance(page_count, bool) or (isinstance(page_count, float) and not page_count.is_integer()):
+            raise ValueError(f'Invalid page_count: {page_count}')
+        try:
+            page_count = int(page_count)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid page_count: {page_count}')
+        if page_count < 0:
+            raise ValueError(f'Invalid page_count: {page_count}')
+    
+    ocr = field('ocr')
+    if ocr is not None:
+        ocr = str(ocr).lower()
+        if ocr not in ('yes', 'no'):
+            raise ValueError("ocr must be 'yes' or 'no'")
+    
+    eta = field('eta')
+    if eta is not None:
+        try:
+            eta = datetime.strptime(str(eta), '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            raise ValueError(f'Invalid eta (expected YYYY-MM-DD): {eta}')
+    
+    return (str(task), str(book_id), developer_assignee, page_count, ocr, eta)
+
+def _insert_import_chunk(conn, chunk, created_by, report_error):
+    """
+    Insert one chunk of (row_number, values) in its own transaction, with a
+    Backlog event per record. If the batch insert hits a constraint the rows
+    are retried one by one so only the offending ones are reported. Returns
+    the number of records inserted.
+    """
     c = conn.cursor()
+    insert_sql = '''
+        INSERT INTO records (task, book_id, developer_assignee, page_count, ocr, eta, status, created_by)
+        VALUES (?, ?, ?, ?, ?, ?, 'Backlog', ?)
+    '''
     
-    # Get current record data before update
-    c.execute("""SELECT status, todo_start_time, in_progress_start_time, in_review_start_time, 
-                review_failed_start_time, total_todo_time, total_in_progress_time, 
-                total_in_review_time, total_review_failed_time FROM records WHERE id = ?""", (record_id,))
-    current_record = c.fetchone()
-    if current_record:
-        (current_status, current_todo_start, current_in_progress_start, current_in_review_start, 
-         current_review_failed_start, current_total_todo, current_total_in_progress, 
-         current_total_in_review, current_total_review_failed) = current_record
-    else:
-        (current_status, current_todo_start, current_in_progress_start, current_in_review_start, 
-         current_review_failed_start, current_total_todo, current_total_in_progress, 
-         current_total_in_review, current_total_review_failed) = (None, None, None, None, None, 0, 0, 0, 0)
+    # The write lock is held from BEGIN, so every id above the current
+    # maximum belongs to this chunk
+    c.execute("BEGIN IMMEDIATE")
+    c.execute("SELECT COALESCE(MAX(id), 0) FROM records")
+    last_id = c.fetchone()[0]
+    try:
+        c.executemany(insert_sql, [values + (created_by,) for _, values in chunk])
+        inserted = len(chunk)
+    except sqlite3.IntegrityError:
+        # Others may have written while the lock was released
+        conn.rollback()
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("SELECT COALESCE(MAX(id), 0) FROM records")
+        last_id = c.fetchone()[0]
+        inserted = 0
+        for row_number, values in chunk:
+            try:
+                c.execute(insert_sql, values + (created_by,))
+                inserted += 1
+            except sqlite3.IntegrityError as e:
+                report_error(row_number, str(e))
+    
+    c.execute('''
+        INSERT INTO record_status_events
+        (record_id, developer_assignee, from_status, to_status, status_started_at, changed_at)
+        SELECT id, developer_assignee, NULL, 'Backlog', NULL, created_date FROM records WHERE id > ?
+    ''', (last_id,))
+    conn.commit()
+    return inserted
+
+def bulk_create_records(rows, created_by, chunk_size=None):
+    """
+    Create Backlog records from an iterable of dicts with task, book_id and
+    optionally developer_assignee, page_count, ocr and eta. Rows are consumed
+    as they arrive and inserted in transactions of chunk_size rows (default
+    IMPORT_CHUNK_SIZE); invalid rows are skipped and reported without
+    affecting the rest. Returns {'imported': n, 'error_count': n, 'errors':
+    [{'row': row_number, 'error': message}, ...]} with at most
+    IMPORT_MAX_ERRORS errors listed. A ValueError raised by the iterable
+    ends the import and is reported against the row it failed on.
+    """
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+    conn = get_connection()
+    
+    # Resolve assignees once for the whole import
+    developers = {user['username'] for user in get_users(role='developer')}
+    
+    errors = []
+    error_count = 0
+    
+    def report_error(row_number, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append({'row': row_number, 'error': message})
+    
+    imported = 0
+    assignees = set()
+    chunk = []
+    row_number = 0
+    rows = iter(rows)
+    end = object()
+    while True:
+        try:
+            row = next(rows, end)
+        except ValueError as e:
+            report_error(row_number + 1, str(e))
+            row = end
+        
+        if row is not end:
+            row_number += 1
+            try:
+                values = _parse_import_row(row, developers)
+            except ValueError as e:
+                report_error(row_number, str(e))
+            else:
+                chunk.append((row_number, values))
+                assignees.add(values[2])
+        
+        if chunk and (row is end or len(chunk) >= chunk_size):
+            imported += _insert_import_chunk(conn, chunk, created_by, report_error)
+            chunk = []
+        if row is end:
+            break
+    
+    if imported:
+        invalidate_workload_cache(assignees, [datetime.now().strftime('%Y-%m-%d')])
+        publish_record_change('created', developers=assignees)
+    
+    errors.sort(key=lambda error: error['row'])
+    return {'imported': imported, 'error_count': error_count, 'errors': errors}
+
+def log_status_event(c, record_id, developer_assignee, from_status, to_status, status_started_at, changed_at):
+    """Append a status transition to record_status_events using the caller's cursor"""
+    c.execute('''
+        INSERT INTO record_status_events
+        (record_id, developer_assignee, from_status, to_status, status_started_at, changed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (record_id, developer_assignee, from_status, to_status, status_started_at, changed_at))
+
+def _status_transition_sql(to_status):
+    """
+    Build the conditional UPDATE that moves a record into to_status from
+    whatever status it is in: stop the running timer and add it to its total,
+    start the target's timer unless it is already running, and stamp
+    published_date on Published. Column references on the right-hand side
+    read the row as it was before the update.
+    """
+    assignments = ["status = ?"]
+    for status, timer in STATUS_TIMERS.items():
+        if timer is None:
+            continue
+        if status == to_status:
+            assignments.append(f"{timer}_start_time = COALESCE({timer}_start_time, {NOW_SQL})")
+        else:
+            assignments.append(
+                f"total_{timer}_time = total_{timer}_time + CASE WHEN status = '{status}' "
+                f"THEN COALESCE(MAX({NOW_SQL} - {timer}_start_time, 0), 0) ELSE 0 END"
+            )
+            assignments.append(
+                f"{timer}_start_time = CASE WHEN status = '{status}' THEN NULL ELSE {timer}_start_time END"
+            )
+    if to_status == 'Published':
+        assignments.append(f"published_date = {NOW_SQL}")
+    return f"UPDATE records SET {', '.join(assignments)} WHERE status <> ?"
+
+# One transition statement per target status; callers add the id condition
+STATUS_TRANSITIONS = {status: _status_transition_sql(status) for status in STATUS_TIMERS}
+
+def _transition_status(c, record_id, status, from_status=None, developer_assignee=None):
+    """Run a status transition on the caller's cursor and return the updated row, or None"""
+    if status not in STATUS_TRANSITIONS:
+        raise ValueError(f'Unknown status: {status}')
+    
+    query = STATUS_TRANSITIONS[status] + " AND id = ?"
+    params = [status, status, record_id]
+    if from_status is not None:
+        query += " AND status = ?"
+        params.append(from_status)
+    if developer_assignee is not None:
+        query += " AND developer_assignee = ?"
+        params.append(developer_assignee)
+    
+    c.execute(query + " RETURNING id, status, developer_assignee", params)
+    row = c.fetchone()
+    if not row:
+        return None
+    return {'id': row[0], 'status': row[1], 'developer_assignee': row[2]}
+
+def transition_record_status(record_id, status, from_status=None, developer_assignee=None):
+    """
+    Move a record to a new status in a single statement. When from_status or
+    developer_assignee is given the record must still have that status or
+    assignee. Returns the record's id, status and assignee after the change,
+    or None when nothing changed: the record does not exist, is already in
+    that status, or a condition did not match.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    
+    record = _transition_status(c, record_id, status, from_status, developer_assignee)
+    _commit(conn)
+    
+    # A status change only closes or opens time today
+    if record:
+        _after_commit(invalidate_workload_cache, [record['developer_assignee']], [datetime.now().strftime('%Y-%m-%d')])
+        _after_commit(publish_record_change, 'updated', record_id, [record['developer_assignee']])
+    return record
+
+def bulk_update_records(record_ids, status=None, developer_assignee=None, from_status=None):
+    """
+    Change the status and/or assignee of many records in one transaction,
+    using the same transition statements as single updates on batches of
+    BULK_BATCH_SIZE ids. from_status, when given, limits the change to
+    records currently in that status. Returns {record_id: result} where
+    result is 'updated', 'unchanged', 'conflict' (not in from_status) or
+    'not_found'.
+    """
+    if status is not None and status not in STATUS_TRANSITIONS:
+        raise ValueError(f'Unknown status: {status}')
+    
+    conn = get_connection()
+    c = conn.cursor()
+    
+    record_ids = list(dict.fromkeys(record_ids))
+    results = {record_id: 'not_found' for record_id in record_ids}
+    previous_developers = {}
+    
+    try:
+        # Take the write lock up front so the rows read below cannot change
+        # before they are updated
+        c.execute("BEGIN IMMEDIATE")
+        for i in range(0, len(record_ids), BULK_BATCH_SIZE):
+            batch = record_ids[i:i + BULK_BATCH_SIZE]
+            c.execute(
+                f"SELECT id, status, developer_assignee FROM records WHERE id IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            eligible = []
+            for record_id, current_status, current_developer in c.fetchall():
+                if from_status is not None and current_status != from_status:
+                    results[record_id] = 'conflict'
+                    continue
+                results[record_id] = 'unchanged'
+                previous_developers[record_id] = current_developer
+                eligible.append(record_id)
+            if not eligible:
+                continue
+            
+            placeholders = ','.join('?' * len(eligible))
+            # Status first so transitions are logged under the previous assignee
+            if status is not None:
+                c.execute(
+                    STATUS_TRANSITIONS[status] + f" AND id IN ({placeholders}) RETURNING id",
+                    [status, status] + eligible
+                )
+                for (record_id,) in c.fetchall():
+                    results[record_id] = 'updated'
+            if developer_assignee is not None:
+                c.execute(
+                    f"UPDATE records SET developer_assignee = ? WHERE id IN ({placeholders}) "
+                    f"AND developer_assignee IS NOT ? RETURNING id",
+                    [developer_assignee] + eligible + [developer_assignee]
+                )
+                for (record_id,) in c.fetchall():
+                    results[record_id] = 'updated'
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    # Same invalidation as update_record, once for the whole batch
+    changed = {previous_developers[record_id] for record_id, result in results.items() if result == 'updated'}
+    if changed and developer_assignee is not None:
+        invalidate_workload_cache(changed | {developer_assignee})
+    elif changed:
+        invalidate_workload_cache(changed, [datetime.now().strftime('%Y-%m-%d')])
+    if changed:
+        publish_record_change('updated', developers=changed | {developer_assignee})
+    
+    return results
+
+def update_record(record_id, task=None, book_id=None, developer_assignee=None, page_count=None, ocr=None, eta=None, status=None):
+    conn = get_connection()
+    c = conn.cursor()
     
     updates = []
     params = []
@@ -289,110 +1587,45 @@ def update_record(record_id, task=None, book_id=None, developer_assignee=None, p
         updates.append("eta = ?")
         params.append(eta)
     
-    # Handle status changes and time tracking
-    if status is not None and status != current_status:
-        updates.append("status = ?")
-        params.append(status)
-        
-        now = datetime.now()
-        
-        # Handle TODO status time tracking
-        if status == 'TODO':
-            # Start TODO timer if not already started
-            if not current_todo_start:
-                updates.append("todo_start_time = ?")
-                params.append(now)
-        elif current_status == 'TODO' and current_todo_start:
-            # Stop TODO timer and add to total
-            todo_time_spent = calculate_time_spent(current_todo_start)
-            updates.append("total_todo_time = total_todo_time + ?")
-            params.append(todo_time_spent)
-            updates.append("todo_start_time = NULL")
-        
-        # Handle In Progress status time tracking
-        if status == 'In Progress':
-            # Start In Progress timer if not already started
-            if not current_in_progress_start:
-                updates.append("in_progress_start_time = ?")
-                params.append(now)
-        elif current_status == 'In Progress' and current_in_progress_start:
-            # Stop In Progress timer and add to total
-            in_progress_time_spent = calculate_time_spent(current_in_progress_start)
-            updates.append("total_in_progress_time = total_in_progress_time + ?")
-            params.append(in_progress_time_spent)
-            updates.append("in_progress_start_time = NULL")
-        
-        # Handle In Review status time tracking
-        if status == 'In Review':
-            # Start In Review timer if not already started
-            if not current_in_review_start:
-                updates.append("in_review_start_time = ?")
-                params.append(now)
-        elif current_status == 'In Review' and current_in_review_start:
-            # Stop In Review timer and add to total
-            in_review_time_spent = calculate_time_spent(current_in_review_start)
-            updates.append("total_in_review_time = total_in_review_time + ?")
-            params.append(in_review_time_spent)
-            updates.append("in_review_start_time = NULL")
-        
-        # Handle Review Failed - In Progress status time tracking
-        if status == 'Review failed - In Progress':
-            # Start Review Failed timer if not already started
-            if not current_review_failed_start:
-                updates.append("review_failed_start_time = ?")
-                params.append(now)
-        elif current_status == 'Review failed - In Progress' and current_review_failed_start:
-            # Stop Review Failed timer and add to total
-            review_failed_time_spent = calculate_time_spent(current_review_failed_start)
-            updates.append("total_review_failed_time = total_review_failed_time + ?")
-            params.append(review_failed_time_spent)
-            updates.append("review_failed_start_time = NULL")
-        
-        # For On-Hold status, stop all timers but don't start new ones
-        if status == 'On-Hold':
-            # Stop any active timers
-            if current_status == 'TODO' and current_todo_start:
-                todo_time_spent = calculate_time_spent(current_todo_start)
-                updates.append("total_todo_time = total_todo_time + ?")
-                params.append(todo_time_spent)
-                updates.append("todo_start_time = NULL")
-            elif current_status == 'In Progress' and current_in_progress_start:
-                in_progress_time_spent = calculate_time_spent(current_in_progress_start)
-                updates.append("total_in_progress_time = total_in_progress_time + ?")
-                params.append(in_progress_time_spent)
-                updates.append("in_progress_start_time = NULL")
-            elif current_status == 'In Review' and current_in_review_start:
-                in_review_time_spent = calculate_time_spent(current_in_review_start)
-                updates.append("total_in_review_time = total_in_review_time + ?")
-                params.append(in_review_time_spent)
-                updates.append("in_review_start_time = NULL")
-            elif current_status == 'Review failed - In Progress' and current_review_failed_start:
-                review_failed_time_spent = calculate_time_spent(current_review_failed_start)
-                updates.append("total_review_failed_time = total_review_failed_time + ?")
-                params.append(review_failed_time_spent)
-                updates.append("review_failed_start_time = NULL")
-        
-        if status == 'Published':
-            updates.append("published_date = ?")
-            params.append(now.strftime('%Y-%m-%d %H:%M:%S'))
+    # The assignee a reassignment takes the record away from
+    current_developer = None
+    if developer_assignee is not None:
+        c.execute("SELECT developer_assignee FROM records WHERE id = ?", (record_id,))
+        row = c.fetchone()
+        current_developer = row[0] if row else None
+    
+    # Change status before the other fields so the transition is logged
+    # under the assignee who did the work
+    transitioned = None
+    if status is not None:
+        transitioned = _transition_status(c, record_id, status)
     
     if updates:
         query = f"UPDATE records SET {', '.join(updates)} WHERE id = ?"
         params.append(record_id)
         c.execute(query, params)
     
-    conn.commit()
-    conn.close()
-
-def get_records(user_role=None, username=None, status=None, search=None, developer_filter=None, limit=20, offset=0):
-    conn = sqlite3.connect('time_tracker.db')
-    c = conn.cursor()
+    _commit(conn)
     
-    query = """
-        SELECT r.*, u.role as created_by_role 
-        FROM records r 
-        JOIN users u ON r.created_by = u.username
-    """
+    # Drop cached workload the change can affect. A reassignment moves the
+    # running interval to the new developer on every day it spans; a status
+    # change only closes or opens time today.
+    if developer_assignee is not None and developer_assignee != current_developer:
+        _after_commit(invalidate_workload_cache, [current_developer, developer_assignee])
+    elif transitioned:
+        _after_commit(invalidate_workload_cache, [transitioned['developer_assignee']], [datetime.now().strftime('%Y-%m-%d')])
+    
+    # Who can see the change: the old and new assignee when reassigning,
+    # the assignee after a transition, otherwise everyone
+    if developer_assignee is not None:
+        _after_commit(publish_record_change, 'updated', record_id, [current_developer, developer_assignee])
+    elif transitioned:
+        _after_commit(publish_record_change, 'updated', record_id, [transitioned['developer_assignee']])
+    elif updates:
+        _after_commit(publish_record_change, 'updated', record_id)
+
+def build_record_filters(user_role=None, username=None, status=None, search=None, developer_filter=None, archive=False):
+    """Return (conditions, params) for the records list filters, on records_archive when archive is True"""
     params = []
     conditions = []
     
@@ -405,51 +1638,310 @@ def get_records(user_role=None, username=None, status=None, search=None, develop
         conditions.append("r.developer_assignee = ?")
         params.append(developer_filter)
     
-    if status:
+    # records_archive holds only Published records, so include_archive()
+    # already settled the status there and it has no status index to use
+    if status and not archive:
         conditions.append("r.status = ?")
         params.append(status)
     
     if search:
-        conditions.append("(r.task LIKE ? OR r.book_id LIKE ? OR r.developer_assignee LIKE ?)")
-        params.extend([f'%{search}%', f'%{search}%', f'%{search}%'])
+        search_condition, search_params = build_search_condition(search, indexed=not archive)
+        conditions.append(search_condition)
+        params.extend(search_params)
     
+    return conditions, params
+
+def include_archive(status=None, include_archived=False):
+    """
+    Whether a records listing reads records_archive too. The archive holds
+    only Published records, so a Published filter always reads it, any other
+    status filter never does, and no filter does when include_archived is set.
+    """
+    if status:
+        return status == 'Published'
+    return bool(include_archived)
+
+def _record_select(table, conditions):
+    query = f"""
+        SELECT r.*, u.role as created_by_role, {live_time_columns()}
+        FROM {table} r 
+        JOIN users u ON r.created_by = u.username
+        {LIVE_TIME_CLOCK}
+    """
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
+    return query
+
+def _build_page_query(conditions, params, limit, offset, cursor, now=None, archive_filters=None):
+    """
+    Page query over records, or over records and records_archive when
+    archive_filters gives (conditions, params) for the archive. The two are
+    then merged in created_date order, each read through its own index.
+    """
+    sources = [('records', list(conditions), list(params))]
+    if archive_filters:
+        sources.append(('records_archive', list(archive_filters[0]), list(archive_filters[1])))
+    
+    # Keyset pagination: seek past the last record of the previous page
+    if cursor:
+        cursor_created_date, cursor_id = decode_cursor(cursor)
+        for table, source_conditions, source_params in sources:
+            source_conditions.append("(r.created_date, r.id) < (?, ?)")
+            source_params.extend([cursor_created_date, cursor_id])
+        offset = 0
     
-    query += " ORDER BY r.created_date DESC LIMIT ? OFFSET ?"
-    params.extend([limit, offset])
+    params = []
+    for table, source_conditions, source_params in sources:
+        params += [clock_value(now)] + source_params
+    
+    if len(sources) == 1:
+        query = _record_select('records', sources[0][1])
+        query += " ORDER BY r.created_date DESC, r.id DESC LIMIT ? OFFSET ?"
+    else:
+        query = " UNION ALL ".join(_record_select(table, source_conditions)
+                                   for table, source_conditions, source_params in sources)
+        query += " ORDER BY created_date DESC, id DESC LIMIT ? OFFSET ?"
+    return query, params + [limit, offset]
+
+def _build_count_query(conditions, params, archive_filters=None):
+    """Count query matching _build_page_query's sources"""
+    sources = [('records', conditions, params)]
+    if archive_filters:
+        sources.append(('records_archive',) + tuple(archive_filters))
+    
+    counts = []
+    count_params = []
+    for table, source_conditions, source_params in sources:
+        count = f"SELECT COUNT(*) FROM {table} r JOIN users u ON r.created_by = u.username"
+        if source_conditions:
+            count += " WHERE " + " AND ".join(source_conditions)
+        counts.append(f"({count})")
+        count_params += source_params
+    return f"SELECT {' + '.join(counts)} AS total_count", count_params
+
+# Joined into queries that select live_time_columns(); binds the request's
+# "now" (epoch seconds) once so every row is measured against the same instant
+LIVE_TIME_CLOCK = "CROSS JOIN (SELECT ? AS now_ts) clock"
+
+LIVE_TIME_KEYS = [
+    key
+    for time_key in TRACKED_STATUS_KEYS.values()
+    for key in ('time_' + time_key[:-5], 'time_' + time_key[:-5] + '_seconds',
+                'time_' + time_key[:-5] + '_hours', 'time_' + time_key[:-5] + '_minutes',
+                'is_' + time_key[:-5] + '_tracking')
+] + ['eta_warning']
+
+def clock_value(now=None):
+    """Epoch seconds bound to LIVE_TIME_CLOCK"""
+    return int(now if now is not None else time.time())
+
+def _tracking_sql(alias, status, prefix):
+    """SQL that is true while the status's timer is running"""
+    return f"({alias}.status = '{status}' AND {alias}.{prefix}_start_time IS NOT NULL)"
+
+def _live_seconds_sql(alias, status, prefix):
+    """SQL for a status's stored total plus its running interval up to clock.now_ts, in seconds"""
+    elapsed = f"CASE WHEN {_tracking_sql(alias, status, prefix)} THEN MAX(clock.now_ts - {alias}.{prefix}_start_time, 0) ELSE 0 END"
+    return f"(COALESCE({alias}.total_{prefix}_time, 0) + {elapsed})"
+
+def live_time_columns(alias='r'):
+    """
+    Select-list SQL for LIVE_TIME_KEYS: for each tracked status the stored
+    total plus the running interval, in hours and in seconds, split into
+    whole hours and minutes, and whether the timer is running; then the ETA
+    warning.
+    """
+    columns = []
+    for status, time_key in TRACKED_STATUS_KEYS.items():
+        prefix = time_key[:-5]
+        tracking = _tracking_sql(alias, status, prefix)
+        live = _live_seconds_sql(alias, status, prefix)
+        columns += [
+            f"{live} / 3600.0 AS time_{prefix}",
+            f"{live} AS time_{prefix}_seconds",
+            f"{live} / 3600 AS time_{prefix}_hours",
+            f"{live} % 3600 / 60 AS time_{prefix}_minutes",
+            f"{tracking} AS is_{prefix}_tracking"
+        ]
+    # Same as (eta - now).days <= 2, with now in local time
+    columns.append(f"COALESCE(julianday({alias}.eta) - julianday(clock.now_ts, 'unixepoch', 'localtime') < 3, 0) AS eta_warning")
+    return ', '.join(columns)
+
+def _row_to_record(row):
+    return {
+        'id': row[0],
+        'task': row[1],
+        'book_id': row[2],
+        'developer_assignee': row[3],
+        'page_count': row[4],
+        'ocr': row[5],
+        'eta': row[6],
+        'status': row[7],
+        'created_by': row[8],
+        'created_date': row[9],
+        'published_date': row[10],
+        'todo_start_time': row[11],
+        'in_progress_start_time': row[12],
+        'in_review_start_time': row[13],
+        'review_failed_start_time': row[14],
+        'total_todo_time': row[15] or 0,
+        'total_in_progress_time': row[16] or 0,
+        'total_in_review_time': row[17] or 0,
+        'total_review_failed_time': row[18] or 0,
+        'row_version': row[19],
+        'created_by_role': row[20],
+        **{key: bool(value) if key.startswith(('is_', 'eta_')) else value
+           for key, value in zip(LIVE_TIME_KEYS, row[21:])}
+    }
+
+def _archive_filters(user_role, username, status, search, developer_filter, include_archived):
+    if not include_archive(status, include_archived):
+        return None
+    return build_record_filters(user_role, username, status, search, developer_filter, archive=True)
+
+def get_records_page(user_role=None, username=None, status=None, search=None, developer_filter=None, limit=20, offset=0, cursor=None, include_total=True, now=None, include_archived=False):
+    """
+    Get a page of records, newest first, together with the total number of
+    matching records in a single statement. When a cursor from
+    encode_cursor() is given the page starts right after that record and
+    offset is ignored. Each record carries its live time per status as of
+    now (default: the current time). Archived records are included as
+    include_archive() says. Returns (records, total); total is None when
+    include_total is False and the count is skipped.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    
+    conditions, params = build_record_filters(user_role, username, status, search, developer_filter)
+    archive_filters = _archive_filters(user_role, username, status, search, developer_filter, include_archived)
+    page_query, page_params = _build_page_query(conditions, params, limit, offset, cursor, now, archive_filters)
+    
+    if not include_total:
+        c.execute(page_query, page_params)
+        return [_row_to_record(row) for row in c.fetchall()], None
+    
+    count_query, count_params = _build_count_query(conditions, params, archive_filters)
+    
+    # LEFT JOIN from the count so an empty page still returns the total
+    query = f"""
+        WITH page AS ({page_query}),
+             total AS ({count_query})
+        SELECT page.*, total.total_count
+        FROM total LEFT JOIN page
+        ORDER BY page.created_date DESC, page.id DESC
+    """
+    c.execute(query, page_params + count_params)
     
-    c.execute(query, params)
     records = []
+    total = 0
     for row in c.fetchall():
-        records.append({
-            'id': row[0],
-            'task': row[1],
-            'book_id': row[2],
-            'developer_assignee': row[3],
-            'page_count': row[4],
-            'ocr': row[5],
-            'eta': row[6],
-            'status': row[7],
-            'created_by': row[8],
-            'created_date': row[9],
-            'published_date': row[10],
-            'todo_start_time': row[11],
-            'in_progress_start_time': row[12],
-            'in_review_start_time': row[13],
-            'review_failed_start_time': row[14],
-            'total_todo_time': row[15] or 0,
-            'total_in_progress_time': row[16] or 0,
-            'total_in_review_time': row[17] or 0,
-            'total_review_failed_time': row[18] or 0,
-            'created_by_role': row[19]
-        })
+        total = row[-1]
+        if row[0] is not None:
+            records.append(_row_to_record(row))
     
-    conn.close()
-    return records
+    return records, total
+
+def get_record_with_time(record_id, now=None):
+    """
+    Get one record shaped like a get_records_page() row, with its live time,
+    or None. Archived records are found too.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    
+    for table in ('records', 'records_archive'):
+        c.execute(_record_select(table, ["r.id = ?"]), (clock_value(now), record_id))
+        row = c.fetchone()
+        if row:
+            return _row_to_record(row)
+    return None
+
+def get_record_changes(since, user_role=None, username=None, limit=None, now=None):
+    """
+    Get what changed after data revision `since`, as seen by the given user:
+    {'revision': current revision, 'records': changed records shaped like
+    get_records_page() rows, 'deleted': ids of deleted records and, for
+    developers, of records no longer visible to them, 'archived': ids of
+    records moved to the archive, 'truncated': True when more than limit
+    (default CHANGES_LIMIT) records changed and none are returned}. Pass the
+    returned revision as `since` next time.
+    """
+    limit = limit or CHANGES_LIMIT
+    conn = get_connection()
+    c = conn.cursor()
+    
+    # Read the revision first: anything written after this shows up again
+    # next time rather than being missed
+    revision = get_data_revision()
+    
+    c.execute(f"""
+        SELECT r.*, u.role as created_by_role, {live_time_columns()}
+        FROM records r
+        JOIN users u ON r.created_by = u.username
+        {LIVE_TIME_CLOCK}
+        WHERE r.row_version > ?
+        ORDER BY r.row_version
+        LIMIT ?
+    """, (clock_value(now), since, limit + 1))
+    rows = c.fetchall()
+    if len(rows) > limit:
+        return {'revision': revision, 'records': [], 'deleted': [], 'archived': [], 'truncated': True}
+    
+    records = []
+    deleted = []
+    for row in rows:
+        record = _row_to_record(row)
+        if user_role == 'developer' and record['developer_assignee'] not in (None, username):
+            deleted.append(record['id'])
+        else:
+            records.append(record)
+    
+    archived = []
+    c.execute("SELECT record_id, archived FROM record_tombstones WHERE row_version > ?", (since,))
+    for record_id, was_archived in c.fetchall():
+        (archived if was_archived else deleted).append(record_id)
+    
+    return {'revision': revision, 'records': records, 'deleted': deleted, 'archived': archived, 'truncated': False}
+
+def get_record_time(record_id, now=None):
+    """Get a record's live time per status (in hours) and its total, or None if it does not exist"""
+    conn = get_connection()
+    c = conn.cursor()
+    
+    for table in ('records', 'records_archive'):
+        c.execute(f"""
+            SELECT {live_time_columns()}
+            FROM {table} r
+            {LIVE_TIME_CLOCK}
+            WHERE r.id = ?
+        """, (clock_value(now), record_id))
+        row = c.fetchone()
+        if row:
+            break
+    else:
+        return None
+    
+    times = dict(zip(LIVE_TIME_KEYS, row))
+    record_time = {'time_' + key[:-5]: times['time_' + key[:-5]] for key in TRACKED_STATUS_KEYS.values()}
+    record_time['total_time'] = sum(record_time.values())
+    return record_time
+
+def encode_cursor(record):
+    """Build an opaque pagination cursor pointing at the given record"""
+    payload = json.dumps([record['created_date'], record['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Return (created_date, id) from a cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_date, record_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(created_date), int(record_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError('Invalid cursor') from e
 
 def get_record_by_id(record_id):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     c.execute("SELECT * FROM records WHERE id = ?", (record_id,))
@@ -480,125 +1972,327 @@ def get_record_by_id(record_id):
     else:
         record = None
     
-    conn.close()
     return record
 
-def calculate_time_spent(start_time):
-    """Calculate time spent from start time to now"""
-    if not start_time:
-        return 0
-    
-    if isinstance(start_time, str):
-        try:
-            start_time = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S')
-        except ValueError:
-            try:
-                start_time = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S.%f')
-            except ValueError:
-                return 0
-    
-    current_time = datetime.now()
-    time_spent = (current_time - start_time).total_seconds() / 3600  # Convert to hours
-    return round(time_spent, 2)
+def format_timestamp(value, fmt='%Y-%m-%d %H:%M:%S'):
+    """Format stored epoch seconds as local time, or '' when unset"""
+    if value is None:
+        return ''
+    return datetime.fromtimestamp(value).strftime(fmt)
 
 def delete_record(record_id):
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     try:
+        c.execute('''
+            SELECT developer_assignee FROM records WHERE id = ?
+            UNION
+            SELECT developer_assignee FROM records_archive WHERE id = ?
+            UNION
+            SELECT developer_assignee FROM record_status_events WHERE record_id = ?
+        ''', (record_id, record_id, record_id))
+        developers = [row[0] for row in c.fetchall()]
+        
         c.execute("DELETE FROM records WHERE id = ?", (record_id,))
+        c.execute("DELETE FROM records_archive WHERE id = ?", (record_id,))
         conn.commit()
         success = True
+        invalidate_workload_cache(developers)
+        publish_record_change('deleted', record_id, developers)
     except sqlite3.Error:
+        conn.rollback()
         success = False
-    finally:
-        conn.close()
     
     return success
 
-def get_records_count(user_role=None, username=None, status=None, search=None, developer_filter=None):
-    conn = sqlite3.connect('time_tracker.db')
+# Columns yielded by iter_export_rows, in order
+EXPORT_CSV_HEADER = ['ID', 'Task', 'Book ID', 'Developer', 'Page Count', 'OCR', 'ETA', 'Status', 'Created By',
+                     'Created Date', 'Published Date', 'TODO Hours', 'In Progress Hours', 'In Review Hours',
+                     'Review Failed Hours', 'Total Hours']
+
+def archive_published_records(older_than_days=None, batch_size=None, now=None):
+    """
+    Move records Published more than older_than_days (default
+    ARCHIVE_AFTER_DAYS) ago from records to records_archive, oldest first,
+    batch_size (default ARCHIVE_BATCH_SIZE) per transaction so writers wait
+    for at most one batch. Their status events stay where they are, and
+    clients syncing by revision see them as archived. Returns how many
+    records were moved.
+    """
+    older_than_days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    cutoff = int(now or time.time()) - int(older_than_days * 86400)
+    
+    conn = get_connection()
     c = conn.cursor()
+    c.execute("PRAGMA table_info(records)")
+    columns = ', '.join(column[1] for column in c.fetchall())
     
-    query = "SELECT COUNT(*) FROM records r JOIN users u ON r.created_by = u.username"
-    params = []
+    archived = 0
+    developers = set()
+    while True:
+        try:
+            # Take the write lock before choosing the batch so none of it can
+            # be moved out of Published meanwhile
+            c.execute("BEGIN IMMEDIATE")
+            c.execute(
+                "SELECT id, developer_assignee FROM records WHERE status = 'Published' AND published_date < ? "
+                "ORDER BY published_date LIMIT ?",
+                (cutoff, batch_size)
+            )
+            rows = c.fetchall()
+            if rows:
+                record_ids = [row[0] for row in rows]
+                placeholders = ','.join('?' * len(record_ids))
+                c.execute(f"INSERT INTO records_archive ({columns}) SELECT {columns} FROM records WHERE id IN ({placeholders})",
+                          record_ids)
+                c.execute(f"DELETE FROM records WHERE id IN ({placeholders})", record_ids)
+                c.execute(f"UPDATE record_tombstones SET archived = 1 WHERE record_id IN ({placeholders})", record_ids)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if not rows:
+            break
+        archived += len(rows)
+        developers.update(row[1] for row in rows)
+    
+    # Workload computed while a batch moved may have missed its records
+    if archived:
+        invalidate_workload_cache(developers)
+        publish_record_change('deleted', developers=developers)
+    return archived
+
+def is_record_archived(record_id):
+    """Whether the record is in records_archive; archived records cannot be changed"""
+    c = get_connection().cursor()
+    c.execute("SELECT 1 FROM records_archive WHERE id = ?", (record_id,))
+    return c.fetchone() is not None
+
+def _archive_horizon(c):
+    """
+    Latest published_date in records_archive, or None when it is empty.
+    Archived records were created, and spent all their tracked time, before
+    it, so queries on later dates can leave the archive out.
+    """
+    c.execute("SELECT MAX(published_date) FROM records_archive")
+    return c.fetchone()[0]
+
+def iter_export_rows(start_date=None, end_date=None, batch_size=None, now=None):
+    """
+    Yield batches of CSV-ready rows (see EXPORT_CSV_HEADER) for records
+    created between start_date and end_date (inclusive local dates,
+    YYYY-MM-DD; either may be omitted), oldest first. Dates are formatted as
+    local time and the live hours per status as of now are computed in the
+    query. Rows are read through a range scan of idx_records_created_date
+    with fetchmany on a connection of their own, so memory stays flat however
+    many records match. Archived records are merged in when the range starts
+    before the archive horizon.
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
     conditions = []
+    params = []
+    start = None
+    
+    if start_date:
+        start = int(datetime.strptime(start_date, '%Y-%m-%d').timestamp())
+        conditions.append("r.created_date >= ?")
+        params.append(start)
+    if end_date:
+        conditions.append("r.created_date < ?")
+        params.append(int((datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).timestamp()))
+    
+    lives = [_live_seconds_sql('r', status, key[:-5]) for status, key in TRACKED_STATUS_KEYS.items()]
+    hours = [f"ROUND({live} / 3600.0, 2)" for live in lives]
+    hours.append(f"ROUND(({' + '.join(lives)}) / 3600.0, 2)")
+    
+    def select(table, extra_columns=''):
+        query = f"""
+            SELECT r.id, r.task, r.book_id, COALESCE(r.developer_assignee, ''), COALESCE(r.page_count, ''),
+                COALESCE(r.ocr, ''), COALESCE(r.eta, ''), r.status, r.created_by,
+                COALESCE(strftime('%Y-%m-%d %H:%M:%S', r.created_date, 'unixepoch', 'localtime'), ''),
+                COALESCE(strftime('%Y-%m-%d %H:%M:%S', r.published_date, 'unixepoch', 'localtime'), ''),
+                {', '.join(hours)}{extra_columns}
+            FROM {table} r
+            {LIVE_TIME_CLOCK}
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return query
+    
+    # A separate connection keeps the long-running read off the thread's
+    # shared one, which other calls may commit or roll back meanwhile. With
+    # reporting configured it reads the snapshot instead of the live file.
+    conn = _open_connection() if REPORTING_MAX_AGE is None else _reporting_export_connection()
+    try:
+        c = conn.cursor()
+        horizon = _archive_horizon(c)
+        merged = horizon is not None and (start is None or start < horizon)
+        if merged:
+            # SQLite merges the two in created_date order, each read through
+            # its own index; the trailing sort_date is dropped from the rows
+            query = (select('records', ', r.created_date AS sort_date') + " UNION ALL "
+                     + select('records_archive', ', r.created_date') + " ORDER BY sort_date, id")
+            params = ([clock_value(now)] + params) * 2
+        else:
+            query = select('records') + " ORDER BY r.created_date, r.id"
+            params = [clock_value(now)] + params
+        
+        c.execute(query, params)
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [row[:-1] for row in rows] if merged else rows
+    finally:
+        conn.close()
+
+def get_status_intervals(start, end, developer_username=None, now=None, developers=None):
+    """
+    Get the intervals developers spent in tracked statuses that overlap
+    [start, end) (epoch seconds), clipped to that range. Closed intervals come
+    from an index range scan of record_status_events, open ones from the
+    records' running timers. Limited to developer_username, or to the
+    developers list, when given. Events of archived records are included
+    when the range starts before the archive horizon. Returns a list of
+    (record_id, developer, status, start, end).
+    """
+    conn = get_reporting_connection()
+    c = conn.cursor()
     
-    if user_role == 'developer' and username:
-        conditions.append("(r.developer_assignee = ? OR r.developer_assignee IS NULL)")
-        params.append(username)
-    
-    # Add developer filter for "Assigned to Me"
-    if developer_filter:
-        conditions.append("r.developer_assignee = ?")
-        params.append(developer_filter)
+    now = int(now or time.time())
+    tracked = list(TRACKED_STATUS_KEYS)
+    placeholders = ', '.join('?' * len(tracked))
+    if developer_username:
+        developers = [developer_username]
+    developers = list(developers) if developers else []
+    developer_placeholders = ', '.join('?' * len(developers))
+    
+    # CROSS JOIN keeps the events range scan as the outer loop. Only events
+    # of records that still exist count, archived ones included if needed.
+    horizon = _archive_horizon(c)
+    if horizon is not None and start < horizon:
+        record_source = ("WHERE (EXISTS (SELECT 1 FROM records r WHERE r.id = e.record_id)"
+                         " OR EXISTS (SELECT 1 FROM records_archive a WHERE a.id = e.record_id)) AND")
+    else:
+        record_source = "CROSS JOIN records r ON r.id = e.record_id WHERE"
+    
+    # An interval starting before end closes before end plus the longest
+    # interval logged, which bounds the changed_at range scan on both sides
+    c.execute("SELECT MAX(changed_at - status_started_at) FROM record_status_events")
+    longest = c.fetchone()[0] or 0
+    query = f"""
+        SELECT e.record_id, e.developer_assignee, e.from_status, e.status_started_at, e.changed_at
+        FROM record_status_events e
+        {record_source} e.changed_at > ? AND e.changed_at <= ? AND e.status_started_at < ?
+        AND e.from_status IN ({placeholders})
+        AND e.developer_assignee IS NOT NULL
+    """
+    params = [start, end + longest, end] + tracked
     
-    if status:
-        conditions.append("r.status = ?")
-        params.append(status)
+    if developers:
+        query += f" AND e.developer_assignee IN ({developer_placeholders})"
+        params += developers
     
-    if search:
-        conditions.append("(r.task LIKE ? OR r.book_id LIKE ? OR r.developer_assignee LIKE ?)")
-        params.extend([f'%{search}%', f'%{search}%', f'%{search}%'])
+    c.execute(query, params)
+    rows = c.fetchall()
+    
+    # Intervals still running, ended at now
+    query = f"""
+        SELECT id, developer_assignee, status,
+            CASE status
+                WHEN 'TODO' THEN todo_start_time
+                WHEN 'In Progress' THEN in_progress_start_time
+                WHEN 'In Review' THEN in_review_start_time
+                WHEN 'Review failed - In Progress' THEN review_failed_start_time
+            END AS started_at,
+            ?
+        FROM records
+        WHERE status IN ({placeholders})
+        AND developer_assignee IS NOT NULL
+    """
+    params = [now] + tracked
     
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
+    if developers:
+        query += f" AND developer_assignee IN ({developer_placeholders})"
+        params += developers
     
     c.execute(query, params)
-    count = c.fetchone()[0]
-    conn.close()
-    return count
-
+    rows += c.fetchall()
+    
+    intervals = []
+    for record_id, developer, status, interval_start, interval_end in rows:
+        if interval_start is None:
+            continue
+        interval_start = max(interval_start, start)
+        interval_end = min(interval_end, end)
+        if interval_start < interval_end:
+            intervals.append((record_id, developer, status, interval_start, interval_end))
+    
+    return intervals
 
+def _lookup_records(c, record_ids, columns):
+    """
+    {id: row} of the given columns (id first) for record_ids, looked up in
+    batches to stay under the variable limit. Ids missing from records are
+    then looked up in records_archive.
+    """
+    records = {}
+    missing = list(record_ids)
+    for table in ('records', 'records_archive'):
+        for i in range(0, len(missing), BULK_BATCH_SIZE):
+            batch = missing[i:i + BULK_BATCH_SIZE]
+            c.execute(f"SELECT {columns} FROM {table} WHERE id IN ({', '.join('?' * len(batch))})", batch)
+            records.update((row[0], row) for row in c.fetchall())
+        missing = [record_id for record_id in missing if record_id not in records]
+        if not missing:
+            break
+    return records
 
+def get_daily_status_time(start_date, end_date=None, developer_username=None, developers=None):
+    """
+    Split status intervals at local midnight into per-day buckets for the
+    dates start_date..end_date (inclusive, YYYY-MM-DD). Returns a dict keyed
+    by (date, developer, record_id, status) with the seconds spent.
+    """
+    start = int(datetime.strptime(start_date, '%Y-%m-%d').timestamp())
+    end = int((datetime.strptime(end_date or start_date, '%Y-%m-%d') + timedelta(days=1)).timestamp())
+    
+    buckets = {}
+    for record_id, developer, status, interval_start, interval_end in get_status_intervals(start, end, developer_username, developers=developers):
+        day_start = interval_start
+        while day_start < interval_end:
+            day = datetime.fromtimestamp(day_start).date()
+            next_midnight = int(datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp())
+            day_end = min(next_midnight, interval_end)
+            key = (day.strftime('%Y-%m-%d'), developer, record_id, status)
+            buckets[key] = buckets.get(key, 0) + (day_end - day_start)
+            day_start = day_end
+    
+    return buckets
 
 def get_developer_workload(date=None, developer_username=None):
     """
     Get workload data for developers for a specific date
     Returns time spent by each developer on each status for the given date
     """
-    conn = sqlite3.connect('time_tracker.db')
-    c = conn.cursor()
-    
     # Default to today if no date provided
     if not date:
         date = datetime.now().strftime('%Y-%m-%d')
     
-    # Build query based on parameters
-    query = """
-        SELECT 
-            r.developer_assignee,
-            r.status,
-            SUM(CASE 
-                WHEN r.status = 'TODO' THEN r.total_todo_time
-                WHEN r.status = 'In Progress' THEN r.total_in_progress_time
-                WHEN r.status = 'In Review' THEN r.total_in_review_time
-                WHEN r.status = 'Review failed - In Progress' THEN r.total_review_failed_time
-                ELSE 0
-            END) as total_time,
-            COUNT(r.id) as record_count
-        FROM records r
-        WHERE r.developer_assignee IS NOT NULL
-        AND DATE(r.created_date) = ?
-    """
-    params = [date]
-    
-    if developer_username:
-        query += " AND r.developer_assignee = ?"
-        params.append(developer_username)
-    
-    query += """
-        GROUP BY r.developer_assignee, r.status
-        ORDER BY r.developer_assignee, r.status
-    """
-    
-    c.execute(query, params)
-    results = c.fetchall()
+    # Collect seconds and records per developer and status
+    totals = {}
+    for (day, developer, record_id, status), seconds in get_daily_status_time(date, date, developer_username).items():
+        entry = totals.setdefault((developer, status), [0, set()])
+        entry[0] += seconds
+        entry[1].add(record_id)
     
     # Process results into a structured format
     workload_data = {}
-    for row in results:
-        developer, status, total_time, record_count = row
+    developer_records = {}
+    for (developer, status), (seconds, record_ids) in sorted(totals.items()):
+        total_time = round(seconds / 3600, 2)
         if developer not in workload_data:
             workload_data[developer] = {
                 'todo_time': 0,
@@ -609,83 +2303,343 @@ def get_developer_workload(date=None, developer_username=None):
                 'record_count': 0,
                 'status_breakdown': {}
             }
+            developer_records[developer] = set()
         
         workload_data[developer]['status_breakdown'][status] = {
             'time': total_time,
-            'record_count': record_count
+            'record_count': len(record_ids)
         }
         
         # Add to specific status totals
-        if status == 'TODO':
-            workload_data[developer]['todo_time'] += total_time
-        elif status == 'In Progress':
-            workload_data[developer]['in_progress_time'] += total_time
-        elif status == 'In Review':
-            workload_data[developer]['in_review_time'] += total_time
-        elif status == 'Review failed - In Progress':
-            workload_data[developer]['review_failed_time'] += total_time
-        
+        workload_data[developer][TRACKED_STATUS_KEYS[status]] += total_time
         workload_data[developer]['total_time'] += total_time
-        workload_data[developer]['record_count'] += record_count
+        developer_records[developer] |= record_ids
+    
+    for developer, record_ids in developer_records.items():
+        workload_data[developer]['record_count'] = len(record_ids)
     
-    conn.close()
     return workload_data
 
 def get_developer_daily_activities(date=None, developer_username=None):
     """
-    Get detailed daily activities for developers
+    Get detailed daily activities for developers: every record a developer
+    spent tracked time on during the date, with that day's time per status
     """
-    conn = sqlite3.connect('time_tracker.db')
-    c = conn.cursor()
-    
     if not date:
         date = datetime.now().strftime('%Y-%m-%d')
     
-    query = """
-        SELECT 
-            r.id,
-            r.task,
-            r.book_id,
-            r.developer_assignee,
-            r.status,
-            r.total_todo_time,
-            r.total_in_progress_time,
-            r.total_in_review_time,
-            r.total_review_failed_time,
-            r.created_date,
-            r.published_date
-        FROM records r
-        WHERE r.developer_assignee IS NOT NULL
-        AND DATE(r.created_date) = ?
-    """
-    params = [date]
+    times = {}
+    for (day, developer, record_id, status), seconds in get_daily_status_time(date, date, developer_username).items():
+        record_times = times.setdefault((developer, record_id), {})
+        record_times[status] = record_times.get(status, 0) + seconds
     
-    if developer_username:
-        query += " AND r.developer_assignee = ?"
-        params.append(developer_username)
+    if not times:
+        return []
     
-    query += " ORDER BY r.developer_assignee, r.created_date"
+    conn = get_reporting_connection()
+    c = conn.cursor()
     
-    c.execute(query, params)
-    results = c.fetchall()
+    record_ids = sorted({record_id for developer, record_id in times})
+    records = _lookup_records(c, record_ids, 'id, task, book_id, status, created_date, published_date')
     
     activities = []
-    for row in results:
+    for (developer, record_id), status_seconds in times.items():
+        row = records.get(record_id)
+        if not row:
+            continue
         activity = {
             'id': row[0],
             'task': row[1],
             'book_id': row[2],
-            'developer_assignee': row[3],
-            'status': row[4],
-            'todo_time': row[5] or 0,
-            'in_progress_time': row[6] or 0,
-            'in_review_time': row[7] or 0,
-            'review_failed_time': row[8] or 0,
-            'created_date': row[9],
-            'published_date': row[10],
-            'total_time': (row[5] or 0) + (row[6] or 0) + (row[7] or 0) + (row[8] or 0)
+            'developer_assignee': developer,
+            'status': row[3],
+            'created_date': row[4],
+            'published_date': row[5]
         }
+        for status, key in TRACKED_STATUS_KEYS.items():
+            activity[key] = round(status_seconds.get(status, 0) / 3600, 2)
+        activity['total_time'] = round(sum(status_seconds.values()) / 3600, 2)
         activities.append(activity)
     
-    conn.close()
-    return activities
\ No newline at end of file
+    activities.sort(key=lambda activity: (activity['developer_assignee'], activity['created_date'] or ''))
+    return activities
+
+WORKLOAD_SUMMARY_HEADER = ['Date', 'Developer', 'Total Hours', 'Records', 'TODO Hours', 'In Progress Hours',
+                           'In Review Hours', 'Review Failed Hours']
+WORKLOAD_DETAIL_HEADER = ['Date', 'Developer', 'Record ID', 'Task', 'Book ID', 'Status', 'TODO Hours',
+                          'In Progress Hours', 'In Review Hours', 'Review Failed Hours', 'Total Hours', 'Created Date']
+
+def get_workload_report(start_date, end_date=None, developers=None):
+    """
+    Build the workload report for the dates start_date..end_date (inclusive,
+    YYYY-MM-DD), optionally limited to a list of developers. Both sections
+    come from one scan of the status intervals for the whole range, grouped
+    per day. Returns (summary_rows, detail_rows) matching
+    WORKLOAD_SUMMARY_HEADER and WORKLOAD_DETAIL_HEADER, ordered by date and
+    developer.
+    """
+    summary = {}
+    detail = {}
+    for (day, developer, record_id, status), seconds in get_daily_status_time(start_date, end_date, developers=developers).items():
+        day_totals = summary.setdefault((day, developer), [{}, set()])
+        day_totals[0][status] = day_totals[0].get(status, 0) + seconds
+        day_totals[1].add(record_id)
+        record_times = detail.setdefault((day, developer, record_id), {})
+        record_times[status] = record_times.get(status, 0) + seconds
+    
+    def hours(status_seconds):
+        return [round(status_seconds.get(status, 0) / 3600, 2) for status in TRACKED_STATUS_KEYS]
+    
+    summary_rows = []
+    for (day, developer), (status_seconds, record_ids) in sorted(summary.items()):
+        summary_rows.append([day, developer, round(sum(status_seconds.values()) / 3600, 2), len(record_ids)]
+                            + hours(status_seconds))
+    
+    conn = get_reporting_connection()
+    c = conn.cursor()
+    record_ids = sorted({record_id for day, developer, record_id in detail})
+    records = _lookup_records(c, record_ids, 'id, task, book_id, status, created_date')
+    
+    detail_rows = []
+    for (day, developer, record_id), status_seconds in sorted(detail.items()):
+        row = records.get(record_id)
+        if not row:
+            continue
+        detail_rows.append([day, developer, record_id, row[1], row[2], row[3]] + hours(status_seconds)
+                           + [round(sum(status_seconds.values()) / 3600, 2), format_timestamp(row[4])])
+    
+    return summary_rows, detail_rows
+
+def get_cached_workload(date, developer_username=None):
+    """
+    Return (workload, activities) for a date, as get_developer_workload and
+    get_developer_daily_activities would. Results are cached per (date,
+    developer) until a write touching that developer and day invalidates
+    them. Today's entries also expire after WORKLOAD_CACHE_TODAY_TTL seconds
+    since running timers keep adding time, and are keyed apart from past
+    days so one cached before midnight is not served for the finished day.
+    With a reporting snapshot the entries are also keyed by its time, so a
+    refresh starts new ones. The returned objects are shared and must not be
+    modified.
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+    running = date >= today
+    key = (date, developer_username or None, reporting_data_as_of(), running)
+    max_age = WORKLOAD_CACHE_TODAY_TTL if running else WORKLOAD_CACHE_MAX_AGE
+    
+    with _workload_cache_lock:
+        entry = _workload_cache.get(key)
+        if entry and (max_age is None or time.monotonic() - entry[0] < max_age):
+            _workload_cache.move_to_end(key)
+            cache_requests.inc(cache='workload', result='hit')
+            return entry[1], entry[2]
+        cache_requests.inc(cache='workload', result='miss')
+        generation = _workload_cache_generation
+    
+    cached_at = time.monotonic()
+    workload = get_developer_workload(date, developer_username)
+    activities = get_developer_daily_activities(date, developer_username)
+    
+    with _workload_cache_lock:
+        # Skip storing if a write invalidated the cache while we computed
+        if generation == _workload_cache_generation and WORKLOAD_CACHE_SIZE > 0:
+            _workload_cache[key] = (cached_at, workload, activities)
+            _workload_cache.move_to_end(key)
+            while len(_workload_cache) > WORKLOAD_CACHE_SIZE:
+                _workload_cache.popitem(last=False)
+    
+    return workload, activities
+
+def invalidate_workload_cache(developers=None, dates=None):
+    """
+    Drop cached workload for the given developers on the given dates
+    (YYYY-MM-DD). None means every developer or every date. The all-developer
+    entries for those dates are always dropped too.
+    """
+    global _workload_cache_generation
+    developers = None if developers is None else {dev for dev in developers if dev}
+    dates = None if dates is None else set(dates)
+    
+    with _workload_cache_lock:
+        _workload_cache_generation += 1
+        for key in list(_workload_cache):
+            date, developer = key[:2]
+            if dates is not None and date not in dates:
+                continue
+            if developer is None or developers is None or developer in developers:
+                del _workload_cache[key]
+
+def publish_record_change(change_type, record_id=None, developers=None):
+    """
+    Announce a committed change ('created', 'updated' or 'deleted') to push
+    clients. record_id is None when many records changed at once. developers
+    lists the assignees the change concerns (None for an unassigned record);
+    developers=None means it concerns everyone.
+    """
+    global _change_feed_sequence
+    with _change_feed_condition:
+        _change_feed_sequence += 1
+        _change_feed.append({
+            'seq': _change_feed_sequence,
+            'type': change_type,
+            'id': record_id,
+            'developers': None if developers is None else set(developers)
+        })
+        _change_feed_condition.notify_all()
+
+def get_change_sequence():
+    """Sequence number of the latest published change"""
+    with _change_feed_condition:
+        return _change_feed_sequence
+
+def wait_for_record_changes(after, timeout):
+    """
+    Return (changes, sequence): the changes published after sequence number
+    `after`, waiting up to timeout seconds for one to arrive, and the latest
+    sequence number. changes is None when some of them have already been
+    dropped from the feed and the client has to reload instead.
+    """
+    with _change_feed_condition:
+        _change_feed_condition.wait_for(lambda: _change_feed_sequence > after, timeout)
+        if _change_feed_sequence > after and (not _change_feed or _change_feed[0]['seq'] > after + 1):
+            return None, _change_feed_sequence
+        return [change for change in _change_feed if change['seq'] > after], _change_feed_sequence
+
+def _commit(conn):
+    """Commit, unless running in a group-commit batch, which commits itself"""
+    if getattr(_local, 'write_batch', None) is None:
+        conn.commit()
+
+def _after_commit(callback, *args):
+    """Run callback now, or once the current group-commit batch has committed"""
+    batch = getattr(_local, 'write_batch', None)
+    if batch is None:
+        callback(*args)
+    else:
+        batch.append((callback, args))
+
+class WriteQueue:
+    """
+    A writer thread that applies queued write calls in batches. Each call
+    runs inside a savepoint of the batch's transaction, so a failing call is
+    undone on its own; its future gets the exception while the rest of the
+    batch commits. Futures resolve only after the commit, and the calls'
+    cache invalidation and change publishing run then too. Calls must use
+    _commit() and _after_commit() rather than committing themselves.
+    """
+
+    def __init__(self, wait_ms=None, max_batch=None):
+        self.wait = (GROUP_COMMIT_WAIT_MS if wait_ms is None else wait_ms) / 1000
+        self.max_batch = max_batch or GROUP_COMMIT_MAX_BATCH
+        self.pid = os.getpid()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        self.queue.put((func, args, kwargs, future))
+        return future
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._apply(batch)
+        close_connection()
+
+    def _apply(self, batch):
+        conn = get_connection()
+        c = conn.cursor()
+        effects = _local.write_batch = []
+        outcomes = []
+        try:
+            c.execute("BEGIN IMMEDIATE")
+            for func, args, kwargs, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                effects_before = len(effects)
+                c.execute("SAVEPOINT queued_write")
+                try:
+                    result = func(*args, **kwargs)
+                    c.execute("RELEASE queued_write")
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    c.execute("ROLLBACK TO queued_write")
+                    c.execute("RELEASE queued_write")
+                    del effects[effects_before:]
+                    outcomes.append((future, None, e))
+            conn.commit()
+        except Exception as e:
+            # The batch as a whole failed, e.g. the write lock timed out or a
+            # savepoint could not be rolled back. Nothing was committed, so
+            # every call still waiting fails, including ones not yet started.
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            for func, args, kwargs, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            _local.write_batch = None
+        
+        write_batch_size.observe(len(outcomes))
+        for callback, args in effects:
+            callback(*args)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+def configure_group_commit(enabled, wait_ms=None, max_batch=None):
+    """Turn the group-commit writer on or off, stopping any running writer"""
+    global GROUP_COMMIT, GROUP_COMMIT_WAIT_MS, GROUP_COMMIT_MAX_BATCH, _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None and _write_queue.pid == os.getpid():
+            _write_queue.stop()
+        _write_queue = None
+        GROUP_COMMIT = enabled
+        if wait_ms is not None:
+            GROUP_COMMIT_WAIT_MS = wait_ms
+        if max_batch is not None:
+            GROUP_COMMIT_MAX_BATCH = max_batch
+
+def run_write(func, *args, **kwargs):
+    """
+    Call a write function (create_record, update_record or
+    transition_record_status) and return its result, going through the
+    group-commit writer when it is on. Waiting for the writer raises
+    concurrent.futures.TimeoutError after GROUP_COMMIT_RESULT_TIMEOUT seconds.
+    """
+    global _write_queue
+    if not GROUP_COMMIT:
+        return func(*args, **kwargs)
+    
+    write_queue = _write_queue
+    # Started on first use, and again in a process forked after that
+    if write_queue is None or write_queue.pid != os.getpid():
+        with _write_queue_lock:
+            if _write_queue is None or _write_queue.pid != os.getpid():
+                _write_queue = WriteQueue()
+            write_queue = _write_queue
+    return write_queue.submit(func, *args, **kwargs).result(GROUP_COMMIT_RESULT_TIMEOUT)
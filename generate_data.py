@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import random
+import time
+from datetime import datetime
+
+# Mean hours a record stays in each status, and where it can go next with
+# what weight. Published is final.
+STATUS_DWELL_HOURS = {
+    'Backlog': 24,
+    'TODO': 12,
+    'In Progress': 30,
+    'In Review': 10,
+    'Review failed - In Progress': 12,
+    'On-Hold': 48
+}
+NEXT_STATUSES = {
+    'Backlog': [('TODO', 9), ('On-Hold', 1)],
+    'TODO': [('In Progress', 9), ('On-Hold', 1)],
+    'In Progress': [('In Review', 17), ('On-Hold', 3)],
+    'In Review': [('Published', 7), ('Review failed - In Progress', 3)],
+    'Review failed - In Progress': [('In Review', 9), ('On-Hold', 1)],
+    'On-Hold': [('TODO', 1), ('In Progress', 1)]
+}
+
+# Words task names are made of, so searches have realistic hit rates
+TASK_WORDS = ['chapter', 'index', 'tables', 'figures', 'appendix', 'cover', 'proofread', 'layout',
+              'footnotes', 'glossary', 'maps', 'captions', 'metadata', 'bibliography', 'preface']
+
+# Rows per transaction
+GENERATE_CHUNK_SIZE = 1000
+
+USER_PASSWORDS = {'admin': 'admin123', 'lead': 'lead123', 'developer': 'dev123'}
+
+def simulate_record(rng, developers, created, now):
+    """
+    Walk a record through the status machine from its creation until now.
+    Returns (status, developer, published_date, start_times, totals, events)
+    where start_times and totals are keyed by timer prefix and events are
+    (developer, from_status, to_status, status_started_at, changed_at).
+    """
+    from database import STATUS_TIMERS
+
+    developer = rng.choice(developers) if rng.random() < 0.9 else None
+    status = 'Backlog'
+    entered = created
+    totals = dict.fromkeys((timer for timer in STATUS_TIMERS.values() if timer), 0)
+    events = []
+    published_date = None
+
+    while status != 'Published':
+        left = entered + int(rng.expovariate(1 / (STATUS_DWELL_HOURS[status] * 3600)))
+        if left >= now:
+            break
+        choices, weights = zip(*NEXT_STATUSES[status])
+        next_status = rng.choices(choices, weights)[0]
+        timer = STATUS_TIMERS[status]
+        if timer:
+            totals[timer] += left - entered
+        events.append((developer, status, next_status, entered if timer else None, left))
+        if next_status == 'Published':
+            published_date = left
+        status, entered = next_status, left
+
+    start_times = dict.fromkeys(totals)
+    if STATUS_TIMERS[status]:
+        start_times[STATUS_TIMERS[status]] = entered
+    return status, developer, published_date, start_times, totals, events
+
+def generate_data(developers=20, records=10000, days=90, seed=None, now=None):
+    """
+    Add admin, lead1 and dev1..devN (passwords as in reset_database.py) and
+    records created over the last `days` days, each with a status history
+    in record_status_events and timers that agree with it.
+    """
+    from database import STATUS_TIMERS, get_connection, hash_password
+
+    rng = random.Random(seed)
+    now = int(now or time.time())
+    conn = get_connection()
+    c = conn.cursor()
+
+    users = [('admin', 'admin'), ('lead1', 'lead')] + [(f'dev{i}', 'developer') for i in range(1, developers + 1)]
+    c.executemany(
+        "INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, ?)",
+        [(username, hash_password(USER_PASSWORDS[role]), role) for username, role in users]
+    )
+    conn.commit()
+    developer_names = [username for username, role in users if role == 'developer']
+
+    timers = [timer for timer in STATUS_TIMERS.values() if timer]
+    columns = (['id', 'task', 'book_id', 'developer_assignee', 'page_count', 'ocr', 'eta', 'status',
+                'created_by', 'created_date', 'published_date']
+               + [f'{timer}_start_time' for timer in timers] + [f'total_{timer}_time' for timer in timers])
+    insert_record = f"INSERT INTO records ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    insert_event = '''
+        INSERT INTO record_status_events
+        (record_id, developer_assignee, from_status, to_status, status_started_at, changed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+
+    # Archived records keep their ids, so new ones start above both tables
+    c.execute("SELECT MAX((SELECT COALESCE(MAX(id), 0) FROM records), (SELECT COALESCE(MAX(id), 0) FROM records_archive))")
+    first_id = c.fetchone()[0] + 1
+    event_count = 0
+    for chunk_start in range(first_id, first_id + records, GENERATE_CHUNK_SIZE):
+        record_rows = []
+        event_rows = []
+        for record_id in range(chunk_start, min(chunk_start + GENERATE_CHUNK_SIZE, first_id + records)):
+            created = now - rng.randrange(days * 86400)
+            status, developer, published_date, start_times, totals, events = simulate_record(
+                rng, developer_names, created, now)
+            task = ' '.join(rng.sample(TASK_WORDS, 2)).capitalize() + f' {record_id}'
+            eta = datetime.fromtimestamp(created + rng.randrange(3, 30) * 86400).strftime('%Y-%m-%d')
+            record_rows.append(
+                [record_id, task, f'BK{record_id:06}', developer, rng.randrange(20, 800), rng.choice(['yes', 'no']),
+                 eta, status, rng.choice(['admin', 'lead1']), created, published_date]
+                + [start_times[timer] for timer in timers] + [totals[timer] for timer in timers]
+            )
+            event_rows += [(record_id,) + event for event in events]
+        c.executemany(insert_record, record_rows)
+        c.executemany(insert_event, event_rows)
+        conn.commit()
+        event_count += len(event_rows)
+
+    return {'users': len(users), 'records': records, 'events': event_count}
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill the database with synthetic users, records and histories')
+    parser.add_argument('--developers', type=int, default=20)
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=90, help='spread record creation over this many days')
+    parser.add_argument('--seed', type=int, help='random seed, for repeatable data')
+    parser.add_argument('--reset', action='store_true', help='delete the database first')
+    parser.add_argument('--db', default=os.environ.get('TIME_TRACKER_DB'), help='database path')
+    args = parser.parse_args()
+
+    from database import close_connection, configure_database, init_db
+
+    configure_database(args.db)
+    if args.reset:
+        # Read after configure_database, which may change it
+        from database import DATABASE_PATH
+        close_connection()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(DATABASE_PATH + suffix):
+                os.remove(DATABASE_PATH + suffix)
+    init_db()
+
+    started = time.monotonic()
+    result = generate_data(args.developers, args.records, args.days, args.seed)
+    print(f"Added {result['users']} users, {result['records']} records and {result['events']} status events "
+          f"in {time.monotonic() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import io
+import json
+import os
+
+# Characters read from a JSON upload at a time
+JSON_READ_SIZE = 64 * 1024
+
+def iter_csv_rows(stream):
+    """Yield each data row of a CSV text stream as a dict keyed by the header row"""
+    try:
+        for row in csv.DictReader(stream):
+            yield row
+    except csv.Error as e:
+        raise ValueError(f'Invalid CSV: {e}') from e
+
+def iter_json_rows(stream):
+    """
+    Yield the objects of a JSON array, or of JSON Lines (one object per line),
+    from a text stream without loading the whole document.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    while True:
+        chunk = stream.read(JSON_READ_SIZE)
+        buffer += chunk
+        while True:
+            # Skip whitespace and the array brackets and separators between objects
+            buffer = buffer.lstrip(' \t\r\n[,]')
+            if not buffer:
+                break
+            try:
+                row, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if not chunk:
+                    raise ValueError(f'Invalid JSON: {e}') from e
+                # Incomplete value; read more
+                break
+            yield row
+            buffer = buffer[end:]
+        if not chunk:
+            return
+
+def read_rows(stream, fmt):
+    """Yield rows from a text stream in the given format ('csv' or 'json')"""
+    if fmt == 'csv':
+        return iter_csv_rows(stream)
+    if fmt == 'json':
+        return iter_json_rows(stream)
+    raise ValueError(f'Unsupported format: {fmt}')
+
+def detect_format(filename):
+    """Guess the import format from a file name, defaulting to CSV"""
+    return 'json' if filename.lower().endswith(('.json', '.jsonl', '.ndjson')) else 'csv'
+
+def open_upload(binary_stream):
+    """Wrap a binary upload as text, dropping a UTF-8 byte order mark"""
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+def main():
+    parser = argparse.ArgumentParser(description='Import records from a CSV or JSON file')
+    parser.add_argument('file', help='CSV with a header row, a JSON array or JSON Lines')
+    parser.add_argument('--format', choices=['csv', 'json'], help='defaults to the file extension')
+    parser.add_argument('--created-by', default='admin', help='username recorded as the creator')
+    parser.add_argument('--db', default=os.environ.get('TIME_TRACKER_DB'), help='database path')
+    args = parser.parse_args()
+
+    from database import bulk_create_records, configure_database, init_db
+
+    configure_database(args.db)
+    init_db()
+
+    fmt = args.format or detect_format(args.file)
+    with open(args.file, 'rb') as f:
+        result = bulk_create_records(read_rows(open_upload(f), fmt), args.created_by)
+
+    print(f"Imported {result['imported']} records")
+    for error in result['errors']:
+        print(f"Row {error['row']}: {error['error']}")
+    if result['error_count'] > len(result['errors']):
+        print(f"... and {result['error_count'] - len(result['errors'])} more errors")
+    return 1 if result['error_count'] else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from http.cookiejar import CookieJar
+from urllib.parse import urlencode
+
+from generate_data import TASK_WORDS, USER_PASSWORDS
+
+# Share of requests per operation. Developers poll and move their records;
+# the admin session pulls workload and exports.
+OPERATION_WEIGHTS = {
+    'records': 50,
+    'records_search': 15,
+    'status_change': 20,
+    'workload': 12,
+    'export_csv': 3
+}
+
+STATUSES = ['TODO', 'In Progress', 'In Review', 'Review failed - In Progress', 'On-Hold', 'Published']
+DEVELOPER_STATUSES = ['In Progress', 'In Review', 'Review failed - In Progress', 'On-Hold']
+
+class AppClient:
+    """Requests against the app in this process through Flask's test client"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+    def login(self, username, password):
+        response = self.client.post('/login', data={'username': username, 'password': password})
+        return response.status_code
+
+class HttpClient:
+    """Requests against a running server, keeping its session cookie"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+    def request(self, method, path, body=None):
+        headers = {}
+        if body is not None:
+            body = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def login(self, username, password):
+        body = urlencode({'username': username, 'password': password}).encode()
+        with self.opener.open(urllib.request.Request(self.base_url + '/login', data=body, method='POST')) as response:
+            # A successful login redirects to the dashboard, a failed one
+            # renders the form again
+            return 302 if response.url.rstrip('/').endswith('/dashboard') else 401
+
+def login(client, username, password):
+    if client.login(username, password) != 302:
+        raise RuntimeError(f'Login failed for {username}')
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class Worker(threading.Thread):
+    """One simulated user: a developer session plus an admin session"""
+
+    def __init__(self, make_client, developer, requests, rng):
+        super().__init__(daemon=True)
+        self.developer_client = make_client()
+        self.admin_client = make_client()
+        self.developer = developer
+        login(self.developer_client, developer, USER_PASSWORDS['developer'])
+        login(self.admin_client, 'admin', USER_PASSWORDS['admin'])
+        self.deadline = None
+        self.requests = requests
+        self.rng = rng
+        self.record_ids = []
+        self.samples = []  # (operation, status code, seconds)
+
+    def run(self):
+        operations, weights = zip(*OPERATION_WEIGHTS.items())
+        count = 0
+        while time.monotonic() < self.deadline and (self.requests is None or count < self.requests):
+            operation = self.rng.choices(operations, weights)[0]
+            client, method, path, body = getattr(self, operation)()
+            started = time.perf_counter()
+            status, data = client.request(method, path, body)
+            self.samples.append((operation, status, time.perf_counter() - started))
+            if operation == 'records' and status == 200:
+                # Developers can only move records assigned to them
+                records = json.loads(data).get('records', [])
+                self.record_ids = ([record['id'] for record in records if record['developer_assignee'] == self.developer]
+                                   or self.record_ids)
+            count += 1
+
+    def records(self):
+        params = {'limit': 20, 'assigned_to_me': 'true' if self.rng.random() < 0.5 else 'false'}
+        if self.rng.random() < 0.4:
+            params['status'] = self.rng.choice(STATUSES)
+        return self.developer_client, 'GET', '/records?' + urlencode(params), None
+
+    def records_search(self):
+        params = {'limit': 20, 'search': self.rng.choice(TASK_WORDS)[:self.rng.randrange(3, 7)]}
+        return self.developer_client, 'GET', '/records?' + urlencode(params), None
+
+    def status_change(self):
+        if not self.record_ids:
+            return self.records()
+        record_id = self.rng.choice(self.record_ids)
+        body = {'status': self.rng.choice(DEVELOPER_STATUSES)}
+        return self.developer_client, 'POST', f'/records/{record_id}/status', body
+
+    def workload(self):
+        date = (datetime.now() - timedelta(days=self.rng.randrange(7))).strftime('%Y-%m-%d')
+        return self.admin_client, 'GET', '/api/workload?' + urlencode({'date': date}), None
+
+    def export_csv(self):
+        end = datetime.now() - timedelta(days=self.rng.randrange(30))
+        params = {'start_date': (end - timedelta(days=7)).strftime('%Y-%m-%d'), 'end_date': end.strftime('%Y-%m-%d')}
+        return self.admin_client, 'GET', '/export/csv?' + urlencode(params), None
+
+def summarize(samples, elapsed):
+    """Throughput and latency (milliseconds) per operation and overall"""
+    by_operation = {}
+    for operation, status, seconds in samples:
+        by_operation.setdefault(operation, []).append((status, seconds))
+    by_operation['all'] = [(status, seconds) for operation, status, seconds in samples]
+
+    report = {}
+    for operation, results in sorted(by_operation.items()):
+        latencies = sorted(seconds * 1000 for status, seconds in results)
+        errors = sum(1 for status, seconds in results if status >= 500 or status in (401, 403))
+        report[operation] = {
+            'requests': len(results),
+            'errors': errors,
+            'conflicts': sum(1 for status, seconds in results if status == 409),
+            'throughput_rps': round(len(results) / elapsed, 2) if elapsed else None,
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'max_ms': round(latencies[-1], 2)
+        }
+    return report
+
+def run_load_test(make_client, developers, workers=4, duration=30, requests=None, seed=None):
+    """
+    Run `workers` simulated users, each logged in as one of `developers`,
+    for `duration` seconds or until each has made `requests` requests.
+    Returns the report from summarize().
+    """
+    rng = random.Random(seed)
+    threads = [Worker(make_client, developers[i % len(developers)], requests, random.Random(rng.random()))
+               for i in range(workers)]
+
+    # Logins are not timed
+    started = time.monotonic()
+    for thread in threads:
+        thread.deadline = started + duration
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return summarize([sample for thread in threads for sample in thread.samples], elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run mixed traffic against the app and report latency per endpoint as JSON')
+    parser.add_argument('--url', help='base URL of a running server; by default the app runs in this process')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run')
+    parser.add_argument('--requests', type=int, help='stop each worker after this many requests')
+    parser.add_argument('--developers', type=int, default=20, help='log workers in as dev1..devN (see generate_data.py)')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--db', default=os.environ.get('TIME_TRACKER_DB'), help='database path, without --url')
+    args = parser.parse_args()
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+    else:
+        if args.db:
+            os.environ['TIME_TRACKER_DB'] = args.db
+        from app import app
+        make_client = lambda: AppClient(app)
+
+    developers = [f'dev{i}' for i in range(1, args.developers + 1)]
+    report = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'target': args.url or 'in-process',
+        'workers': args.workers,
+        'endpoints': run_load_test(make_client, developers, args.workers, args.duration, args.requests, args.seed)
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
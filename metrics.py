@@ -0,0 +1,111 @@
+import bisect
+import threading
+
+# Minimal Prometheus-style metrics kept in this process and rendered in the
+# text exposition format. Each worker process has its own values.
+
+_lock = threading.Lock()
+_metrics = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escape = lambda value: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic count per label values, e.g. counter.inc(route='/records')"""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        _metrics.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for key, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}')
+        return lines
+
+class Histogram:
+    """Observations bucketed by upper bound, with their sum and count"""
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}  # label values -> [bucket counts..., +Inf count, sum]
+        _metrics.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            entry[index] += 1
+            entry[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for key, entry in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), entry):
+                cumulative += count
+                labels = _format_labels(self.labels, key, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(entry[-1])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+class Gauge:
+    """
+    A value read when metrics are rendered. The callback returns a number,
+    or a dict of label value tuples to numbers when the gauge has labels.
+    """
+
+    def __init__(self, name, help, callback, labels=()):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.labels = tuple(labels)
+        _metrics.append(self)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge']
+        values = self.callback()
+        if not self.labels:
+            values = {(): values}
+        for key, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}')
+        return lines
+
+def render_metrics():
+    """All registered metrics in the Prometheus text format"""
+    lines = []
+    for metric in list(_metrics):
+        if isinstance(metric, Gauge):
+            lines += metric.render()
+        else:
+            with _lock:
+                lines += metric.render()
+    return '\n'.join(lines) + '\n'
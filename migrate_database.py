@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import argparse
+import os
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply pending database schema migrations')
+    parser.add_argument('--check', action='store_true',
+                        help='only list pending migrations; exits with 1 if there are any')
+    parser.add_argument('--db', default=os.environ.get('TIME_TRACKER_DB'), help='database path')
+    args = parser.parse_args()
+
+    from database import SCHEMA_VERSION, configure_database, get_schema_version, migrate, pending_migrations
+
+    configure_database(args.db)
+
+    pending = pending_migrations()
+    if args.check:
+        print(f"Database is at version {get_schema_version()}; this code expects {SCHEMA_VERSION}")
+        for number, description in pending:
+            print(f"Pending migration {number}: {description}")
+        return 1 if pending else 0
+
+    applied = migrate()
+    print(f"Database is at version {get_schema_version()} ({len(applied)} migrations applied)")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,20 +1,22 @@
 #!/usr/bin/env python3
 import os
-import sqlite3
 
 def reset_database():
-    # Remove the existing database file
-    if os.path.exists('time_tracker.db'):
-        os.remove('time_tracker.db')
-        print("Removed existing database file")
+    from database import DATABASE_PATH, close_connection, get_connection, init_db
+
+    # Remove the existing database file along with its WAL side files
+    close_connection()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(DATABASE_PATH + suffix):
+            os.remove(DATABASE_PATH + suffix)
+    print("Removed existing database file")
     
     # Reinitialize the database
-    from database import init_db
     init_db()
     print("Database reinitialized successfully")
     
     # Add some test data
-    conn = sqlite3.connect('time_tracker.db')
+    conn = get_connection()
     c = conn.cursor()
     
     # Add test users
@@ -44,8 +46,7 @@ def reset_database():
     ''', ('Test Task 2', 'BOOK002', None, 50, 'no', None, 'Backlog', 'admin'))
     
     conn.commit()
-    conn.close()
     print("Test data added successfully")
 
 if __name__ == '__main__':
-    reset_database()
\ No newline at end of file
+    reset_database()
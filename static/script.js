@@ -7,10 +7,26 @@ let currentPage = 1;
 const recordsPerPage = 20;
 let totalRecords = 0;
 let totalPages = 1;
+let pageCursors = [''];  // pageCursors[i] holds the cursor that loads page i + 1
 let currentSearch = '';
 let currentStatusFilter = '';
 let currentAssignedToMeFilter = false;
 let isLoading = false;
+let currentRecords = [];
+let recordsEtag = null;   // validator of the records on screen
+let recordsRevision = null;  // data revision the records on screen are current to
+let syncingChanges = false;
+let changesPending = false;
+let clockOffset = 0;      // server time minus local time, in seconds
+
+// Time field prefix for each tracked status, and the hours that fill its progress bar
+const TRACKED_STATUSES = {
+    'TODO': 'todo',
+    'In Progress': 'in_progress',
+    'In Review': 'in_review',
+    'Review failed - In Progress': 'review_failed'
+};
+const PROGRESS_FULL_HOURS = { todo: 24, in_progress: 48, in_review: 48, review_failed: 48 };
 
 // Toast notification system
 let toastCounter = 0;
@@ -140,6 +156,7 @@ async function initializeApp() {
     console.log('Initializing app...');
     await loadDevelopers();
     await loadRecords();
+    connectRecordEvents();
     
     // Set up event listeners
     setupEventListeners();
@@ -327,7 +344,16 @@ async function loadRecords(page = 1) {
         currentSearch = searchQuery;
         currentAssignedToMeFilter = assignedToMe;
         
+        // Use keyset cursors for pages reached by next/previous and fall back
+        // to page numbers when jumping to a page we have no cursor for
+        if (page === 1) {
+            pageCursors = [''];
+        }
+        const pageCursor = pageCursors[page - 1];
         let url = `/records?page=${page}&limit=${recordsPerPage}`;
+        if (pageCursor !== undefined) {
+            url += `&cursor=${encodeURIComponent(pageCursor)}`;
+        }
         if (statusFilter) {
             url += `&status=${encodeURIComponent(statusFilter)}`;
         }
@@ -340,7 +366,14 @@ async function loadRecords(page = 1) {
         
         console.log('Loading records from:', url);
         
-        const response = await fetch(url);
+        // Revalidate what is on screen; an unchanged page comes back as 304
+        const headers = recordsEtag ? { 'If-None-Match': recordsEtag } : {};
+        const response = await fetch(url, { headers, cache: 'no-store' });
+        
+        if (response.status === 304) {
+            tickTimers();
+            return;
+        }
         
         if (!response.ok) {
             if (response.status === 401) {
@@ -358,6 +391,18 @@ async function loadRecords(page = 1) {
         
         console.log('Records loaded successfully:', data.records?.length || 0, 'records');
         
+        recordsEtag = response.headers.get('ETag');
+        recordsRevision = data.revision ?? null;
+        clockOffset = data.server_time ? data.server_time - Date.now() / 1000 : 0;
+        currentRecords = data.records || [];
+        
+        totalRecords = data.total_records || 0;
+        totalPages = data.total_pages || 1;
+        pageCursors.length = page;
+        if (data.next_cursor) {
+            pageCursors[page] = data.next_cursor;
+        }
+        
         if (data.records && data.records.length > 0) {
             displayRecords(data.records, data.user_role);
         } else {
@@ -381,6 +426,11 @@ async function loadRecords(page = 1) {
         }
     } finally {
         isLoading = false;
+        // Catch up on changes pushed while the page was loading
+        if (changesPending && !syncingChanges) {
+            changesPending = false;
+            syncChanges();
+        }
     }
 }
 
@@ -439,7 +489,7 @@ function displayPagination() {
     }
     
     // Next button
-    paginationHTML += `<button onclick="loadRecords(${currentPage + 1})" ${currentPage === totalPages ? 'disabled' : ''}>Next</button>`;
+    paginationHTML += `<button onclick="loadRecords(${currentPage + 1})" ${currentPage >= totalPages ? 'disabled' : ''}>Next</button>`;
     
     // Page info
     paginationHTML += `<div class="pagination-info">Page ${currentPage} of ${totalPages} (${totalRecords} total records)</div>`;
@@ -470,6 +520,46 @@ function displayRecords(records, userRole) {
     addRecordEventListeners();
 }
 
+// Seconds a record has spent in a status. The running timer is ticked on the
+// client from its start time, so the page stays current between fetches.
+function liveSeconds(record, prefix) {
+    let seconds = record[`total_${prefix}_time`] || 0;
+    const start = record[`${prefix}_start_time`];
+    if (start && TRACKED_STATUSES[record.status] === prefix) {
+        seconds += Math.max(Math.floor(Date.now() / 1000 + clockOffset) - start, 0);
+    }
+    return seconds;
+}
+
+function progressPercent(record, prefix) {
+    return Math.min((liveSeconds(record, prefix) / 3600 / PROGRESS_FULL_HOURS[prefix]) * 100, 100);
+}
+
+// Format seconds as hours and minutes
+function formatDuration(seconds) {
+    const hours = Math.floor(seconds / 3600);
+    const minutes = Math.floor((seconds % 3600) / 60);
+    if (hours === 0 && minutes === 0) return '0m';
+    if (hours === 0) return `${minutes}m`;
+    if (minutes === 0) return `${hours}h`;
+    return `${hours}h ${minutes}m`;
+}
+
+// Advance the running timers on screen without asking the server
+function tickTimers() {
+    currentRecords.forEach(record => {
+        const prefix = TRACKED_STATUSES[record.status];
+        if (!prefix || !record[`${prefix}_start_time`]) return;
+        
+        const card = document.querySelector(`.record-card[data-record-id="${record.id}"]`);
+        if (!card) return;
+        const value = card.querySelector(`.time-tracker-value[data-time="${prefix}"]`);
+        const fill = card.querySelector(`.compact-progress-fill[data-time="${prefix}"]`);
+        if (value) value.textContent = formatDuration(liveSeconds(record, prefix));
+        if (fill) fill.style.width = `${progressPercent(record, prefix)}%`;
+    });
+}
+
 // Create HTML for a record card
 function createRecordCard(record, userRole) {
     const canEdit = userRole === 'admin' || userRole === 'lead';
@@ -477,23 +567,15 @@ function createRecordCard(record, userRole) {
     const canChangeStatus = (isAssignedDeveloper && userRole === 'developer') || canEdit;
     
     // Calculate progress percentages based on accumulated time
-    const todoProgress = Math.min((record.time_todo / 24) * 100, 100);
-    const inProgressProgress = Math.min((record.time_in_progress / 48) * 100, 100);
-    const inReviewProgress = Math.min((record.time_in_review / 48) * 100, 100);
-    const reviewFailedProgress = Math.min((record.time_review_failed / 48) * 100, 100);
-    
-    // Format time with hours and minutes
-    const formatTime = (hours, minutes) => {
-        if (hours === 0 && minutes === 0) return '0m';
-        if (hours === 0) return `${minutes}m`;
-        if (minutes === 0) return `${hours}h`;
-        return `${hours}h ${minutes}m`;
-    };
+    const todoProgress = progressPercent(record, 'todo');
+    const inProgressProgress = progressPercent(record, 'in_progress');
+    const inReviewProgress = progressPercent(record, 'in_review');
+    const reviewFailedProgress = progressPercent(record, 'review_failed');
     
-    const todoTimeFormatted = formatTime(record.time_todo_hours, record.time_todo_minutes);
-    const inProgressTimeFormatted = formatTime(record.time_in_progress_hours, record.time_in_progress_minutes);
-    const inReviewTimeFormatted = formatTime(record.time_in_review_hours, record.time_in_review_minutes);
-    const reviewFailedTimeFormatted = formatTime(record.time_review_failed_hours, record.time_review_failed_minutes);
+    const todoTimeFormatted = formatDuration(liveSeconds(record, 'todo'));
+    const inProgressTimeFormatted = formatDuration(liveSeconds(record, 'in_progress'));
+    const inReviewTimeFormatted = formatDuration(liveSeconds(record, 'in_review'));
+    const reviewFailedTimeFormatted = formatDuration(liveSeconds(record, 'review_failed'));
     
     return `
         <div class="record-card ${record.eta_warning ? 'warning' : ''}" data-record-id="${record.id}">
@@ -554,10 +636,10 @@ function createRecordCard(record, userRole) {
                                 TODO
                                 ${record.is_todo_tracking ? '<span class="tracking-badge">Tracking</span>' : ''}
                             </div>
-                            <div class="time-tracker-value">${todoTimeFormatted}</div>
+                            <div class="time-tracker-value" data-time="todo">${todoTimeFormatted}</div>
                         </div>
                         <div class="compact-progress-bar">
-                            <div class="compact-progress-fill todo" style="width: ${todoProgress}%"></div>
+                            <div class="compact-progress-fill todo" data-time="todo" style="width: ${todoProgress}%"></div>
                         </div>
                     </div>
                     <div class="time-tracker in-progress ${record.is_in_progress_tracking ? 'tracking-active' : ''}">
@@ -567,10 +649,10 @@ function createRecordCard(record, userRole) {
                                 In Progress
                                 ${record.is_in_progress_tracking ? '<span class="tracking-badge">Tracking</span>' : ''}
                             </div>
-                            <div class="time-tracker-value">${inProgressTimeFormatted}</div>
+                            <div class="time-tracker-value" data-time="in_progress">${inProgressTimeFormatted}</div>
                         </div>
                         <div class="compact-progress-bar">
-                            <div class="compact-progress-fill in-progress" style="width: ${inProgressProgress}%"></div>
+                            <div class="compact-progress-fill in-progress" data-time="in_progress" style="width: ${inProgressProgress}%"></div>
                         </div>
                     </div>
                     <div class="time-tracker in-review ${record.is_in_review_tracking ? 'tracking-active' : ''}">
@@ -580,10 +662,10 @@ function createRecordCard(record, userRole) {
                                 In Review
                                 ${record.is_in_review_tracking ? '<span class="tracking-badge">Tracking</span>' : ''}
                             </div>
-                            <div class="time-tracker-value">${inReviewTimeFormatted}</div>
+                            <div class="time-tracker-value" data-time="in_review">${inReviewTimeFormatted}</div>
                         </div>
                         <div class="compact-progress-bar">
-                            <div class="compact-progress-fill in-review" style="width: ${inReviewProgress}%"></div>
+                            <div class="compact-progress-fill in-review" data-time="in_review" style="width: ${inReviewProgress}%"></div>
                         </div>
                     </div>
                     <div class="time-tracker review-failed ${record.is_review_failed_tracking ? 'tracking-active' : ''}">
@@ -593,10 +675,10 @@ function createRecordCard(record, userRole) {
                                 Review Failed
                                 ${record.is_review_failed_tracking ? '<span class="tracking-badge">Tracking</span>' : ''}
                             </div>
-                            <div class="time-tracker-value">${reviewFailedTimeFormatted}</div>
+                            <div class="time-tracker-value" data-time="review_failed">${reviewFailedTimeFormatted}</div>
                         </div>
                         <div class="compact-progress-bar">
-                            <div class="compact-progress-fill review-failed" style="width: ${reviewFailedProgress}%"></div>
+                            <div class="compact-progress-fill review-failed" data-time="review_failed" style="width: ${reviewFailedProgress}%"></div>
                         </div>
                     </div>
                 </div>
@@ -604,7 +686,7 @@ function createRecordCard(record, userRole) {
             
             <div class="record-actions">
                 ${canChangeStatus ? `
-                <select class="status-select" data-record-id="${record.id}">
+                <select class="status-select" data-record-id="${record.id}" data-status="${record.status}">
                     ${userRole === 'developer' ? 
                         `
                         <option value="Backlog" disabled ${record.status === 'Backlog' ? 'selected' : ''}>Backlog</option>
@@ -639,15 +721,15 @@ function createRecordCard(record, userRole) {
     `;
 }
 
-// Add event listeners to record action buttons
-function addRecordEventListeners() {
+// Add event listeners to record action buttons, within root (default: the whole page)
+function addRecordEventListeners(root = document) {
     // Status change handlers
-    document.querySelectorAll('.status-select').forEach(select => {
+    root.querySelectorAll('.status-select').forEach(select => {
         select.addEventListener('change', handleStatusChange);
     });
     
     // Edit button handlers
-    document.querySelectorAll('.edit-btn').forEach(btn => {
+    root.querySelectorAll('.edit-btn').forEach(btn => {
         btn.addEventListener('click', handleEditRecord);
     });
 }
@@ -656,6 +738,7 @@ function addRecordEventListeners() {
 async function handleStatusChange(event) {
     const recordId = event.target.dataset.recordId;
     const newStatus = event.target.value;
+    const fromStatus = event.target.dataset.status;
     
     try {
         const response = await fetch(`/records/${recordId}/status`, {
@@ -663,7 +746,7 @@ async function handleStatusChange(event) {
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ status: newStatus })
+            body: JSON.stringify({ status: newStatus, from_status: fromStatus })
         });
         
         const data = await response.json();
@@ -891,10 +974,11 @@ async function exportCSV() {
 }
 
 // Utility functions
-function formatDate(dateString) {
-    if (!dateString) return 'N/A';
+function formatDate(value) {
+    if (!value) return 'N/A';
     
-    const date = new Date(dateString);
+    // Timestamps arrive as epoch seconds; ETA is a YYYY-MM-DD string
+    const date = typeof value === 'number' ? new Date(value * 1000) : new Date(value);
     return date.toLocaleDateString() + ' ' + date.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
 }
 
@@ -908,9 +992,111 @@ function escapeHtml(unsafe) {
         .replace(/'/g, "&#039;");
 }
 
-// Auto-refresh records every 30 seconds to update time tracking
-setInterval(() => {
-    if (document.visibilityState === 'visible') {
-        loadRecords(currentPage);
+// Listen for record changes pushed by the server when it has push updates
+// turned on; otherwise, or without EventSource, refresh every 30 seconds.
+// Unchanged pages come back as 304s.
+function connectRecordEvents() {
+    if (!document.getElementById('recordsContainer')) return;
+    
+    if (document.body.dataset.pushUpdates !== 'true' || !window.EventSource) {
+        setInterval(() => {
+            if (document.visibilityState === 'visible') {
+                loadRecords(currentPage);
+            }
+        }, 30000);
+        return;
+    }
+    
+    const source = new EventSource('/records/events');
+    source.addEventListener('change', event => handleRecordChange(JSON.parse(event.data)));
+    source.addEventListener('refresh', () => loadRecords(currentPage));
+}
+
+// Any pushed change is applied by fetching the delta since the revision on
+// screen, so a burst of changes costs one request
+function handleRecordChange(change) {
+    syncChanges();
+}
+
+// Patch or remove the affected cards in place, and reload the page only when
+// the changes can alter which records it shows
+async function syncChanges() {
+    if (syncingChanges || isLoading) {
+        changesPending = true;
+        return;
+    }
+    if (recordsRevision === null) {
+        await loadRecords(currentPage);
+        return;
     }
-}, 30000);
\ No newline at end of file
+    
+    syncingChanges = true;
+    try {
+        const response = await fetch(`/records/changes?since=${recordsRevision}`, { cache: 'no-store' });
+        const data = response.ok ? await response.json() : null;
+        if (!data || data.error || data.truncated) {
+            await loadRecords(currentPage);
+            return;
+        }
+        
+        const filtered = currentStatusFilter || currentSearch || currentAssignedToMeFilter;
+        const newestId = Math.max(0, ...currentRecords.map(record => record.id));
+        let reload = false;
+        
+        for (const id of data.deleted) {
+            const card = document.querySelector(`.record-card[data-record-id="${id}"]`);
+            if (card) {
+                card.remove();
+                currentRecords = currentRecords.filter(record => record.id !== id);
+            }
+        }
+        
+        // Archived records still match the Published filter
+        if (currentStatusFilter !== 'Published') {
+            for (const id of data.archived || []) {
+                const card = document.querySelector(`.record-card[data-record-id="${id}"]`);
+                if (card) {
+                    card.remove();
+                    currentRecords = currentRecords.filter(record => record.id !== id);
+                }
+            }
+        }
+        
+        for (const record of data.records) {
+            const card = document.querySelector(`.record-card[data-record-id="${record.id}"]`);
+            if (!card) {
+                // Off screen: it may now match the filter, or be new on page 1
+                if (filtered || (currentPage === 1 && record.id > newestId)) reload = true;
+            } else if (currentStatusFilter && record.status !== currentStatusFilter) {
+                reload = true;
+            } else {
+                currentRecords = currentRecords.map(current => current.id === record.id ? record : current);
+                card.insertAdjacentHTML('afterend', createRecordCard(record, currentUserRole));
+                const updated = card.nextElementSibling;
+                card.remove();
+                addRecordEventListeners(updated);
+            }
+        }
+        
+        if (data.server_time) {
+            clockOffset = data.server_time - Date.now() / 1000;
+        }
+        if (reload) {
+            await loadRecords(currentPage);
+        } else {
+            recordsRevision = data.revision;
+        }
+    } catch (error) {
+        console.error('Error syncing records:', error);
+        await loadRecords(currentPage);
+    } finally {
+        syncingChanges = false;
+        if (changesPending) {
+            changesPending = false;
+            syncChanges();
+        }
+    }
+}
+
+// Keep running timers moving between refreshes
+setInterval(tickTimers, 15000);
\ No newline at end of file
@@ -64,6 +64,7 @@ async function loadWorkloadData() {
         
         displayWorkloadSummary(data.workload);
         displayActivities(data.activities);
+        displayDataAsOf(data.data_as_of, data.max_staleness_seconds);
         
     } catch (error) {
         console.error('Error loading workload data:', error);
@@ -83,6 +84,17 @@ async function loadWorkloadData() {
     }
 }
 
+// Shown only when the server reads reports from a snapshot
+function displayDataAsOf(dataAsOf, maxStaleness) {
+    const element = document.getElementById('dataAsOf');
+    if (!dataAsOf) {
+        element.style.display = 'none';
+        return;
+    }
+    element.textContent = `Data as of ${new Date(dataAsOf).toLocaleString()} (refreshed at least every ${Math.round(maxStaleness)}s)`;
+    element.style.display = '';
+}
+
 function displayWorkloadSummary(workloadData) {
     const container = document.getElementById('workloadSummary');
     
@@ -250,10 +262,11 @@ function formatTimeDisplay(hours) {
     }
 }
 
-function formatDate(dateString) {
-    if (!dateString) return 'N/A';
+function formatDate(value) {
+    if (!value) return 'N/A';
     
-    const date = new Date(dateString);
+    // Timestamps arrive as epoch seconds; ETA is a YYYY-MM-DD string
+    const date = typeof value === 'number' ? new Date(value * 1000) : new Date(value);
     return date.toLocaleDateString() + ' ' + date.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
 }
 
@@ -267,50 +280,25 @@ function escapeHtml(unsafe) {
         .replace(/'/g, "&#039;");
 }
 
-async function exportWorkloadReport() {
+// Download the workload report for the selected date (through the export
+// end date, if set) as built by the server
+function exportWorkloadReport() {
     try {
-        let url = `/api/workload?date=${currentDate}`;
-        if (currentDeveloper) {
-            url += `&developer=${encodeURIComponent(currentDeveloper)}`;
-        }
+        const startDate = document.getElementById('workloadDate').value || currentDate;
+        const endDate = document.getElementById('workloadEndDate').value || startDate;
         
-        const response = await fetch(url);
-        const data = await response.json();
-        
-        if (data.error) {
-            throw new Error(data.error);
+        if (endDate < startDate) {
+            throw new Error('Export end date must not be before the start date');
         }
         
-        // Create CSV content
-        let csvContent = 'Workload Report - ' + currentDate + '\n\n';
-        
-        // Summary section
-        csvContent += 'Developer Workload Summary\n';
-        csvContent += 'Developer,Total Time,Total Records,TODO Time,In Progress Time,In Review Time,Review Failed Time\n';
-        
-        Object.entries(data.workload).forEach(([developer, workload]) => {
-            csvContent += `"${developer}","${formatTimeDisplay(workload.total_time)}","${workload.record_count}","${formatTimeDisplay(workload.todo_time)}","${formatTimeDisplay(workload.in_progress_time)}","${formatTimeDisplay(workload.in_review_time)}","${formatTimeDisplay(workload.review_failed_time)}"\n`;
-        });
-        
-        csvContent += '\n\nDetailed Activities\n';
-        csvContent += 'Developer,Task,Book ID,Status,TODO Time,In Progress Time,In Review Time,Review Failed Time,Total Time,Created Date\n';
-        
-        data.activities.forEach(activity => {
-            csvContent += `"${activity.developer_assignee}","${activity.task}","${activity.book_id}","${activity.status}","${formatTimeDisplay(activity.todo_time)}","${formatTimeDisplay(activity.in_progress_time)}","${formatTimeDisplay(activity.in_review_time)}","${formatTimeDisplay(activity.review_failed_time)}","${formatTimeDisplay(activity.total_time)}","${activity.created_date}"\n`;
-        });
-        
-        // Create and download file
-        const blob = new Blob([csvContent], { type: 'text/csv' });
-        const urlBlob = URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = urlBlob;
-        a.download = `workload-report-${currentDate}.csv`;
-        document.body.appendChild(a);
-        a.click();
-        document.body.removeChild(a);
-        URL.revokeObjectURL(urlBlob);
+        const params = new URLSearchParams({ start_date: startDate, end_date: endDate });
+        const developer = document.getElementById('developerFilter').value;
+        if (developer) {
+            params.append('developer', developer);
+        }
         
-        showSuccessToast('Workload report exported successfully');
+        window.location.href = `/export/workload?${params.toString()}`;
+        showSuccessToast('Workload report export started');
         
     } catch (error) {
         console.error('Error exporting workload report:', error);
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Checks that the dashboard and workload queries read through indexes. Each
+test runs a query function on a small temporary database, captures the SQL
+it executes and checks EXPLAIN QUERY PLAN for every statement: tables must
+be searched through an index, or scanned through one in the page order so
+no sort is needed.
+
+    python -m unittest test_query_plans
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+import database
+
+# Plan rows that scan something other than a stored table
+HARMLESS_SCANS = ('SCAN clock', 'SCAN CONSTANT ROW', 'SCAN page', 'SCAN total')
+
+class QueryPlanTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        database.close_connection()
+        database.configure_database(os.path.join(cls.directory, 'plans.db'))
+        database.init_db()
+
+        for username in ('dev1', 'dev2'):
+            database.create_user(username, 'pw', 'developer')
+        for i in range(40):
+            database.create_record(f'Chapter {i}', f'BK{i:04}', 'admin', ('dev1', 'dev2', None)[i % 3])
+        for record_id in range(1, 31):
+            database.transition_record_status(record_id, 'In Progress')
+        for record_id in range(1, 11):
+            database.transition_record_status(record_id, 'Published')
+        # Archive what is Published so far, then publish a few more
+        database.archive_published_records(0, now=time.time() + 1)
+        for record_id in range(11, 16):
+            database.transition_record_status(record_id, 'Published')
+
+    @classmethod
+    def tearDownClass(cls):
+        database.close_connection()
+        shutil.rmtree(cls.directory)
+
+    def capture(self, func, *args, **kwargs):
+        """Run func and return the SELECT statements it executed, parameters expanded"""
+        statements = []
+        conn = database.get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            func(*args, **kwargs)
+        finally:
+            conn.set_trace_callback(None)
+        statements = [sql for sql in statements if sql.lstrip().upper().startswith(('SELECT', 'WITH'))]
+        self.assertTrue(statements, 'no queries captured')
+        return statements
+
+    def assertIndexed(self, func, *args, ordered=True, **kwargs):
+        conn = database.get_connection()
+        for sql in self.capture(func, *args, **kwargs):
+            plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+            report = f'\n{sql}\n' + '\n'.join(plan)
+            # A full-text MATCH shows up as a scan of the virtual table
+            scans = [step for step in plan
+                     if step.startswith('SCAN') and not step.startswith(HARMLESS_SCANS) and 'VIRTUAL TABLE' not in step]
+            for step in scans:
+                self.assertIn('INDEX', step, report)
+            # Rows found by SEARCH may be sorted; a scan must already be in order
+            if ordered and scans and 'ORDER BY' in sql and 'ORDER BY page.' not in sql:
+                self.assertFalse(any('TEMP B-TREE FOR ORDER BY' in step for step in plan), report)
+
+    def assertPagesIndexed(self, **filters):
+        # With and without the total count, and with a keyset cursor
+        self.assertIndexed(database.get_records_page, limit=21, **filters)
+        self.assertIndexed(database.get_records_page, limit=21, include_total=False, **filters)
+        cursor = database.encode_cursor({'created_date': int(time.time()), 'id': 20})
+        self.assertIndexed(database.get_records_page, limit=21, cursor=cursor, include_total=False, **filters)
+
+    def test_unfiltered(self):
+        self.assertPagesIndexed()
+
+    def test_developer_role(self):
+        self.assertPagesIndexed(user_role='developer', username='dev1')
+
+    def test_assigned_to_me(self):
+        self.assertPagesIndexed(user_role='developer', username='dev1', developer_filter='dev1')
+
+    def test_status(self):
+        self.assertPagesIndexed(status='In Progress')
+        self.assertPagesIndexed(user_role='developer', username='dev1', status='In Progress')
+
+    def test_published_with_archive(self):
+        self.assertPagesIndexed(status='Published')
+        self.assertPagesIndexed(include_archived=True)
+
+    def test_search(self):
+        if not database.search_index_available():
+            self.skipTest('SQLite built without the FTS5 trigram tokenizer')
+        # Not with Published: the archive has no search index and is read
+        # with LIKE (see build_search_condition)
+        self.assertPagesIndexed(search='chapter')
+        self.assertPagesIndexed(status='In Progress', search='chapter')
+        self.assertPagesIndexed(user_role='developer', username='dev1', search='chapter')
+
+    def test_developer_workload(self):
+        today = datetime.now().strftime('%Y-%m-%d')
+        self.assertIndexed(database.get_developer_workload, today)
+        self.assertIndexed(database.get_developer_workload, today, 'dev1')
+        self.assertIndexed(database.get_developer_daily_activities, today)
+        # A range reaching back before the archive horizon reads the archive too
+        self.assertIndexed(database.get_workload_report, '2000-01-01', today)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Checks that the records search box finds the same records whichever way a
+term is matched: the trigram index for terms of three or more characters,
+LIKE for shorter ones and for archived records. Case is ignored for
+non-ASCII letters as well.
+
+    python -m unittest test_search
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import database
+
+class SearchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        database.close_connection()
+        database.configure_database(os.path.join(cls.directory, 'search.db'))
+        database.init_db()
+
+        database.create_user('dév', 'pw', 'developer')
+        database.create_record('CAFÉ menu', 'BK0001', 'admin')
+        database.create_record('über chapter', 'BK0002', 'admin')
+        database.create_record('Chapter ΣΊΣΥΦΟΣ', 'BK0003', 'admin', 'dév')
+        database.create_record('Plain chapter', 'BK0004', 'admin')
+        # Publish and archive the first two, so they are only found by LIKE
+        for record_id in (1, 2):
+            database.transition_record_status(record_id, 'Published')
+        database.archive_published_records(0, now=time.time() + 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        database.close_connection()
+        shutil.rmtree(cls.directory)
+
+    def search(self, text, **filters):
+        records, total = database.get_records_page(search=text, limit=50, **filters)
+        self.assertEqual(total, len(records))
+        return sorted(record['book_id'] for record in records)
+
+    def test_fold_case(self):
+        self.assertEqual(database.fold_case('CAFÉ ΣΊΣΥΦΟΣ'), 'café σίσυφοσ')
+        self.assertIsNone(database.fold_case(None))
+
+    def test_non_ascii_case(self):
+        # Live records, through the index and through LIKE
+        self.assertEqual(self.search('σίσυφ'), ['BK0003'])
+        self.assertEqual(self.search('ΣΊ'), ['BK0003'])
+        self.assertEqual(self.search('DÉV'), ['BK0003'])
+        self.assertEqual(self.search('DÉ'), ['BK0003'])
+
+    def test_archived_records(self):
+        self.assertEqual(self.search('café', status='Published'), ['BK0001'])
+        self.assertEqual(self.search('ÜBER', status='Published'), ['BK0002'])
+        self.assertEqual(self.search('ÜB', status='Published'), ['BK0002'])
+
+    def test_short_and_long_terms_agree(self):
+        self.assertEqual(self.search('CHAPTER', include_archived=True), ['BK0002', 'BK0003', 'BK0004'])
+        self.assertEqual(self.search('ch', include_archived=True), ['BK0002', 'BK0003', 'BK0004'])
+
+if __name__ == '__main__':
+    unittest.main()